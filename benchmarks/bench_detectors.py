@@ -0,0 +1,82 @@
+# This script compares the face detectors in src/detectors.py on the same images.
+# By default it uses the enrollment photos in data/known_faces/, where every
+# image contains exactly one face, so:
+#   recall = share of images where at least one face was found
+#   extra  = boxes found beyond the one real face (false alarms or duplicates)
+#
+# Run it from the project folder:
+#   python -m benchmarks.bench_detectors
+#   python -m benchmarks.bench_detectors --images some/folder --scale 0.25
+
+import argparse
+import time
+import cv2
+from pathlib import Path
+from config.config import KNOWN_FACES_DIR
+from src.detectors import DETECTOR_NAMES, create_detector
+from src.frame_sources import IMAGE_EXTENSIONS
+
+
+def load_images(folder, scale):
+    """Loads every image under 'folder' as RGB, resized by 'scale'."""
+    images = []
+    for path in sorted(Path(folder).rglob("*")):
+        if path.suffix.lower() not in IMAGE_EXTENSIONS:
+            continue
+        image = cv2.imread(str(path))
+        if image is None:
+            continue
+        if scale != 1.0:
+            image = cv2.resize(image, (0, 0), fx=scale, fy=scale)
+        images.append(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+    return images
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Face detector benchmark")
+    parser.add_argument("--images", default=str(KNOWN_FACES_DIR))
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Resize images first (run uses 0.25 of the webcam frame)",
+    )
+    parser.add_argument("--detectors", nargs="+", default=list(DETECTOR_NAMES))
+    args = parser.parse_args()
+
+    images = load_images(args.images, args.scale)
+    if not images:
+        print(f"No images found in {args.images}.")
+        return
+
+    height, width = images[0].shape[:2]
+    print(f"{len(images)} images (first is {width}x{height})\n")
+    print(f"{'detector':>10} {'ms/image':>10} {'recall':>8} {'extra':>7}")
+
+    for name in args.detectors:
+        try:
+            detector = create_detector(name)
+        except RuntimeError as e:
+            print(f"{name:>10}  skipped: {e}")
+            continue
+
+        detector.detect(images[0])  # warm-up
+
+        found = 0
+        extra = 0
+        start = time.perf_counter()
+        for image in images:
+            boxes = detector.detect(image)
+            if boxes:
+                found += 1
+                extra += len(boxes) - 1
+        elapsed = time.perf_counter() - start
+
+        print(
+            f"{name:>10} {elapsed * 1000 / len(images):10.1f}"
+            f" {found / len(images):8.1%} {extra:7d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
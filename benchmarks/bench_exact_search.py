@@ -0,0 +1,110 @@
+# This script measures how exact gallery search scales with the number of CPU cores.
+# It uses a random gallery, so no database, webcam or encodings file is needed.
+#
+# Sharded workers use one BLAS thread each, so the baseline for the scaling
+# numbers is the linear search with one BLAS thread too (run in a worker
+# process). The in-process linear time uses numpy's default thread count.
+#
+# Run it from the project folder:
+#   python -m benchmarks.bench_exact_search --rows 500000 --queries 8
+
+import argparse
+import os
+import time
+import numpy as np
+from src.matcher import LinearMatcher, SharedMemoryMatcher, single_thread_pool
+
+
+def time_search(matcher, queries, repeats):
+    """Returns the best (lowest) time in seconds for one search call."""
+    matcher.search(queries)  # warm-up (starts workers, touches memory)
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        matcher.search(queries)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def make_data(rows, num_queries):
+    """Fake encodings with roughly the same scale as real 128-d face encodings."""
+    rng = np.random.default_rng(0)
+    gallery = rng.normal(0.0, 0.09, size=(rows, 128))
+    queries = gallery[rng.integers(0, rows, num_queries)] + rng.normal(
+        0.0, 0.02, size=(num_queries, 128)
+    )
+    return gallery, queries
+
+
+def time_linear_in_worker(task):
+    """Runs in a single-BLAS-thread worker: times the linear search there."""
+    rows, num_queries, repeats = task
+    # Rebuilt from the same seed, so we don't have to send the gallery over
+    gallery, queries = make_data(rows, num_queries)
+    return time_search(LinearMatcher(gallery), queries, repeats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exact search scaling benchmark")
+    parser.add_argument("--rows", type=int, default=500000, help="Gallery size")
+    parser.add_argument("--queries", type=int, default=8, help="Faces per search")
+    parser.add_argument(
+        "--max-workers", type=int, default=os.cpu_count(), help="Highest core count"
+    )
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    gallery, queries = make_data(args.rows, args.queries)
+
+    print(f"Gallery: {args.rows} x 128, {args.queries} faces per search")
+
+    # --- 1. Baseline: the original per-face face_distance loop ---
+    start = time.perf_counter()
+    for query in queries:
+        np.argmin(np.linalg.norm(gallery - query, axis=1))
+    baseline = time.perf_counter() - start
+    print(f"{'face_distance loop':>22}: {baseline * 1000:8.1f} ms")
+
+    # --- 2. Blocked matrix-product search in one process ---
+    linear = LinearMatcher(gallery)
+    expected = linear.search(queries)[1]
+    linear_time = time_search(linear, queries, args.repeats)
+    threads = os.environ.get("OPENBLAS_NUM_THREADS") or os.environ.get(
+        "OMP_NUM_THREADS", f"default, {os.cpu_count()} cores"
+    )
+    print(
+        f"{'linear (1 process)':>22}: {linear_time * 1000:8.1f} ms"
+        f"  ({baseline / linear_time:4.1f}x vs loop, BLAS threads: {threads})"
+    )
+
+    pool = single_thread_pool(1)
+    try:
+        single_time = pool.apply(
+            time_linear_in_worker, ((args.rows, args.queries, args.repeats),)
+        )
+    finally:
+        pool.terminate()
+        pool.join()
+    print(
+        f"{'linear (1 BLAS thread)':>22}: {single_time * 1000:8.1f} ms"
+        f"  (baseline for the sharded rows)"
+    )
+
+    # --- 3. Sharded search with 1..N worker processes ---
+    for workers in range(1, args.max_workers + 1):
+        matcher = SharedMemoryMatcher(gallery, workers=workers)
+        try:
+            result = matcher.search(queries)[1]
+            if not np.array_equal(result, expected):
+                print(f"  WARNING: {workers} workers gave different matches!")
+            elapsed = time_search(matcher, queries, args.repeats)
+        finally:
+            matcher.close()
+        print(
+            f"{f'sharded ({workers} workers)':>22}: {elapsed * 1000:8.1f} ms"
+            f"  ({single_time / elapsed:4.1f}x vs 1 thread)"
+        )
+
+
+if __name__ == "__main__":
+    main()
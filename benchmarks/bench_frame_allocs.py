@@ -0,0 +1,95 @@
+# This script compares how much memory each processed frame allocates with
+# the old per-frame code and with the buffer-reusing FrameProcessor.
+# It uses tracemalloc (which also sees NumPy and OpenCV arrays) and
+# synthetic frames, so no webcam is needed.
+#
+# Run it from the project folder:
+#   python -m benchmarks.bench_frame_allocs --frames 200
+#   python -m benchmarks.bench_frame_allocs --faces data/known_faces --detect
+
+import argparse
+import time
+import tracemalloc
+import cv2
+import numpy as np
+import face_recognition
+from src.frame_processing import FrameProcessor
+from src.frame_sources import SyntheticSource
+
+
+def old_path(frame, detect):
+    """The per-frame steps run_recognizer used before FrameProcessor."""
+    read_frame = frame.copy()  # cv2.VideoCapture.read() returned a new array
+    small_frame = cv2.resize(read_frame, (0, 0), fx=0.25, fy=0.25)
+    rgb_small_frame = small_frame[:, :, ::-1]
+    if detect:
+        locations = face_recognition.face_locations(rgb_small_frame)
+        face_recognition.face_encodings(rgb_small_frame, locations)
+    else:
+        # This is the copy dlib makes of the non-contiguous reversed view
+        np.ascontiguousarray(rgb_small_frame)
+
+
+def new_path(processor, frame, detect):
+    """The same steps with the reused buffers."""
+    if processor.frame is None:
+        processor.frame = np.empty_like(frame)
+    np.copyto(processor.frame, frame)  # the camera fills our buffer in place
+    rgb = processor.prepare(processor.frame)
+    if detect:
+        processor.detect_and_encode(rgb)
+
+
+def measure(step, frames):
+    """
+    Runs 'step' on every frame and returns (bytes allocated per frame, ms per frame).
+    'Allocated' is the peak memory above the starting point during the frame,
+    i.e. the temporary arrays that have to be created and freed again.
+    """
+    step(frames[0])  # warm-up, so one-time buffer allocations are not counted
+
+    per_frame = []
+    tracemalloc.start()
+    start = time.perf_counter()
+    for frame in frames:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        step(frame)
+        _, peak = tracemalloc.get_traced_memory()
+        per_frame.append(peak - before)
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+
+    return float(np.mean(per_frame)), elapsed * 1000 / len(frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-frame allocation report")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--faces", help="Folder of face images for the synthetic scene")
+    parser.add_argument(
+        "--detect", action="store_true", help="Also run face detection + encoding"
+    )
+    args = parser.parse_args()
+
+    source = SyntheticSource(args.faces, num_frames=args.frames)
+    frames = []
+    while True:
+        ret, frame = source.read()
+        if not ret:
+            break
+        frames.append(frame)
+
+    processor = FrameProcessor()
+    old_bytes, old_ms = measure(lambda f: old_path(f, args.detect), frames)
+    new_bytes, new_ms = measure(lambda f: new_path(processor, f, args.detect), frames)
+
+    height, width = frames[0].shape[:2]
+    print(f"{len(frames)} frames of {width}x{height}, detection: {args.detect}\n")
+    print(f"{'path':>16} {'KB allocated/frame':>20} {'ms/frame':>10}")
+    print(f"{'old (per frame)':>16} {old_bytes / 1024:20.1f} {old_ms:10.2f}")
+    print(f"{'FrameProcessor':>16} {new_bytes / 1024:20.1f} {new_ms:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
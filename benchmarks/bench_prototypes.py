@@ -0,0 +1,166 @@
+# This script measures what the prototype gallery ('compact_gallery') saves
+# and what it costs:
+#   - how much smaller the gallery gets (shrink factor)
+#   - how much faster matching is
+#   - how many match decisions (at MATCH_THRESHOLD) change on held-out faces,
+#     i.e. faces that are not in the gallery
+#
+# It uses your real encodings.pkl if you pass --encodings (one sample per
+# student is held out as a query), otherwise a synthetic gallery where each
+# student has some burst duplicates and a few "unusual" photos (glasses, light).
+#
+# Run it from the project folder:
+#   python -m benchmarks.bench_prototypes --students 3000 --samples 10
+
+import argparse
+import pickle
+import time
+import numpy as np
+from config.config import MATCH_THRESHOLD
+from src.matcher import LinearMatcher
+from src.prototypes import build_prototype_gallery
+
+
+def synthetic_gallery(students, samples, queries_per_student, rng):
+    """
+    Returns (data, queries, truth). 'data' looks like encodings.pkl.
+    Queries are new samples of enrolled students plus strangers (truth None).
+    """
+    centers = rng.normal(0.0, 0.05, size=(students, 128))
+    # A second look per student (e.g. glasses), ~0.4 away from the usual one
+    looks = centers + rng.normal(0.0, 0.035, size=centers.shape)
+
+    def draw(count, noise):
+        owner = np.repeat(np.arange(students), count)
+        unusual = rng.random(len(owner)) < 0.2
+        base = np.where(unusual[:, None], looks[owner], centers[owner])
+        return owner, base + rng.normal(0.0, noise, size=base.shape)
+
+    owner, gallery = draw(samples, 0.025)
+    # Some photos are burst shots of the one before
+    burst = np.flatnonzero(rng.random(len(gallery)) < 0.2)
+    burst = burst[(burst > 0) & (owner[burst] == owner[burst - 1])]
+    gallery[burst] = gallery[burst - 1] + rng.normal(0.0, 0.003, size=(len(burst), 128))
+
+    query_owner, queries = draw(queries_per_student, 0.03)
+    strangers = rng.normal(0.0, 0.05, size=(len(queries) // 4, 128))
+
+    ids = [f"S{i:05d}" for i in owner]
+    data = {
+        "encodings": list(gallery),
+        "ids": ids,
+        "names": ids,
+        "paths": [f"{sid}/{n}.jpg" for n, sid in enumerate(ids)],
+    }
+    truth = [f"S{i:05d}" for i in query_owner] + [None] * len(strangers)
+    return data, np.vstack([queries, strangers]), truth
+
+
+def hold_out(data, rng):
+    """Takes one random sample of every student with 2+ samples out as a query."""
+    ids = data["ids"]
+    rows_by_student = {}
+    for row, student_id in enumerate(ids):
+        rows_by_student.setdefault(student_id, []).append(row)
+
+    held = {int(rng.choice(rows)) for rows in rows_by_student.values() if len(rows) > 1}
+    keep = [row for row in range(len(ids)) if row not in held]
+    held = sorted(held)
+
+    encodings = np.asarray(data["encodings"]).reshape(-1, 128)
+    paths = data.get("paths") or [None] * len(ids)
+    gallery = {
+        "encodings": list(encodings[keep]),
+        "ids": [ids[row] for row in keep],
+        "names": [data["names"][row] for row in keep],
+        "paths": [paths[row] for row in keep],
+    }
+    return gallery, encodings[held], [ids[row] for row in held]
+
+
+def decisions(matcher, ids, queries, batch=256):
+    """Matched student ID for each query, or None for 'Unknown'."""
+    result = []
+    for start in range(0, len(queries), batch):
+        distances, indices = matcher.search(queries[start : start + batch], k=1)
+        for distance, index in zip(distances[:, 0], indices[:, 0]):
+            result.append(ids[index] if distance <= MATCH_THRESHOLD else None)
+    return result
+
+
+def timed(func, repeat=3):
+    """Best of 'repeat' runs, to keep noise out of the speedup."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return value, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prototype gallery benchmark")
+    parser.add_argument(
+        "--encodings", help="Use this encodings.pkl instead of fake data"
+    )
+    parser.add_argument("--students", type=int, default=3000)
+    parser.add_argument("--samples", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=2)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+
+    if args.encodings:
+        with open(args.encodings, "rb") as f:
+            data, queries, truth = hold_out(pickle.load(f), rng)
+    else:
+        data, queries, truth = synthetic_gallery(
+            args.students, args.samples, args.queries, rng
+        )
+
+    full = np.asarray(data["encodings"], dtype=np.float64).reshape(-1, 128)
+    start = time.perf_counter()
+    compact = build_prototype_gallery(data)
+    build_time = time.perf_counter() - start
+    stats = compact["stats"]
+
+    print(f"Gallery: {stats['samples']} samples of {stats['students']} students")
+    print(f"Held-out query faces: {len(queries)} ({truth.count(None)} strangers)")
+    print(f"Threshold: {MATCH_THRESHOLD}\n")
+
+    full_matcher = LinearMatcher(full)
+    compact_matcher = LinearMatcher(compact["encodings"])
+    reference, full_time = timed(lambda: decisions(full_matcher, data["ids"], queries))
+    result, compact_time = timed(
+        lambda: decisions(compact_matcher, compact["ids"], queries)
+    )
+
+    changed = [i for i in range(len(queries)) if result[i] != reference[i]]
+    full_correct = sum(r == t for r, t in zip(reference, truth))
+    compact_correct = sum(r == t for r, t in zip(result, truth))
+    fixed = sum(result[i] == truth[i] for i in changed)
+
+    print(f"{'gallery':>11} {'rows':>8} {'memory':>9} {'time':>8} {'correct':>9}")
+    for label, rows, elapsed, correct in (
+        ("full", len(full), full_time, full_correct),
+        ("prototypes", stats["prototypes"], compact_time, compact_correct),
+    ):
+        print(
+            f"{label:>11} {rows:8d} {rows * 128 * 8 / 1e6:7.1f}MB"
+            f" {elapsed * 1000:6.0f}ms {correct / len(queries):8.1%}"
+        )
+
+    print(f"\nShrink factor:    {stats['samples'] / stats['prototypes']:.1f}x")
+    print(f"Match speedup:    {full_time / compact_time:.1f}x")
+    print(f"Build time:       {build_time:.1f}s")
+    print(f"Duplicates dropped: {stats['duplicates']}")
+    print(f"Samples not covered by a prototype: {stats['uncovered']}")
+    print(
+        f"Decisions changed: {len(changed)} of {len(queries)} "
+        f"({fixed} now correct, {len(changed) - fixed} now wrong)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# This script measures what a compact (float16 / int8) gallery costs and saves:
+#   - memory used by the gallery
+#   - search time
+#   - how many match decisions (at MATCH_THRESHOLD) change compared to float64,
+#     both with and without full-precision re-scoring of the final candidates.
+#     A decision is the matched *student* (or 'Unknown'), so picking another
+#     sample of the same student does not count as a change.
+#
+# It uses your real encodings.pkl if you pass --encodings, otherwise a synthetic
+# gallery of students with several samples each.
+#
+# Run it from the project folder:
+#   python -m benchmarks.bench_quantized --students 5000 --samples 10
+
+import argparse
+import pickle
+import time
+import numpy as np
+from config.config import MATCH_THRESHOLD
+from src.matcher import LinearMatcher, QuantizedMatcher
+from src.quantize import gallery_nbytes
+
+
+def synthetic_gallery(students, samples, queries_per_student, rng):
+    """
+    Builds fake encodings where samples of the same student are ~0.4 apart and
+    different students are ~0.8 apart (similar to real face_recognition output).
+    Returns (gallery, owners, queries). owners[row] is the student of each
+    gallery row. Queries are held-out samples, not in the gallery.
+    """
+    centers = rng.normal(0.0, 0.05, size=(students, 128))
+    gallery = np.repeat(centers, samples, axis=0)
+    gallery += rng.normal(0.0, 0.025, size=gallery.shape)
+
+    queries = np.repeat(centers[:, None, :], queries_per_student, axis=1).reshape(
+        -1, 128
+    )
+    queries = queries + rng.normal(0.0, 0.03, size=queries.shape)
+
+    # Add some strangers who are not in the gallery at all
+    strangers = rng.normal(0.0, 0.05, size=(len(queries) // 4, 128))
+    owners = np.arange(len(gallery)) // samples
+    return gallery, owners, np.vstack([queries, strangers])
+
+
+def nearest_rows(matcher, queries, batch=256):
+    """Nearest gallery row per query, or -1 if it is over MATCH_THRESHOLD."""
+    result = np.empty(len(queries), dtype=np.int64)
+    for start in range(0, len(queries), batch):
+        distances, indices = matcher.search(queries[start : start + batch], k=1)
+        result[start : start + batch] = np.where(
+            distances[:, 0] <= MATCH_THRESHOLD, indices[:, 0], -1
+        )
+    return result
+
+
+def decisions(rows, owners):
+    """Matched student per query (from nearest_rows), or -1 for 'Unknown'."""
+    return np.where(rows >= 0, owners[rows], -1)
+
+
+def timed(func):
+    start = time.perf_counter()
+    value = func()
+    return value, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantized gallery benchmark")
+    parser.add_argument(
+        "--encodings", help="Use this encodings.pkl instead of fake data"
+    )
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--samples", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+
+    if args.encodings:
+        with open(args.encodings, "rb") as f:
+            data = pickle.load(f)
+        gallery = np.asarray(data["encodings"]).reshape(-1, 128)
+        # Student IDs as numbers, so decisions can be compared with numpy
+        _, owners = np.unique(data["ids"], return_inverse=True)
+        # Use noisy copies of random samples as queries
+        picks = rng.integers(0, len(gallery), args.queries)
+        queries = gallery[picks] + rng.normal(0.0, 0.03, size=(args.queries, 128))
+    else:
+        per_student = max(1, args.queries // args.students)
+        gallery, owners, queries = synthetic_gallery(
+            args.students, args.samples, per_student, rng
+        )
+
+    print(f"Gallery: {len(gallery)} samples, {len(queries)} query faces")
+    print(f"Threshold: {MATCH_THRESHOLD}\n")
+
+    # --- 1. Reference: full float64 gallery ---
+    reference_matcher = LinearMatcher(gallery)
+    reference_rows, base_time = timed(lambda: nearest_rows(reference_matcher, queries))
+    reference = decisions(reference_rows, owners)
+    print(
+        f"{'storage':>10} {'rescore':>8} {'memory':>10} {'time':>9}"
+        f" {'speedup':>8} {'flipped':>8} {'other row':>10}"
+    )
+    print(
+        f"{'float64':>10} {'-':>8} {gallery.nbytes / 1e6:8.1f}MB"
+        f" {base_time * 1000:7.0f}ms {1.0:7.2f}x {0:8d} {0:10d}"
+    )
+
+    # --- 2. Compact galleries, without and with re-scoring ---
+    for storage in ("float16", "int8"):
+        for rescore in (False, True):
+            matcher = QuantizedMatcher(
+                gallery, storage=storage, rescore_source=gallery if rescore else None
+            )
+            rows, elapsed = timed(lambda: nearest_rows(matcher, queries))
+            flipped = int(np.count_nonzero(decisions(rows, owners) != reference))
+            other_row = int(np.count_nonzero(rows != reference_rows)) - flipped
+            print(
+                f"{storage:>10} {'yes' if rescore else 'no':>8}"
+                f" {gallery_nbytes(matcher.quantized) / 1e6:8.1f}MB"
+                f" {elapsed * 1000:7.0f}ms {base_time / elapsed:7.2f}x {flipped:8d}"
+                f" {other_row:10d}"
+            )
+
+    print(
+        "\n'flipped' = queries matched to a different student (or Unknown) than float64."
+    )
+    print("'other row' = same student, but another of their samples was the closest.")
+    print("Memory for 'rescore = yes' excludes the memory-mapped encodings.npy.")
+
+
+if __name__ == "__main__":
+    main()
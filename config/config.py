@@ -23,10 +23,56 @@ MODELS_DIR = DATA_DIR / "models"  # <-- NEW folder for your .pkl file
 # --- Database File ---
 DB_PATH = DATA_DIR / "students.db"
 
+# --- Attendance Archive ---
+# 'archive' moves old attendance rows into one archive file in this folder,
+# one table per month. The current month (ARCHIVE_KEEP_MONTHS = 1) stays in students.db.
+ARCHIVE_DIR = DATA_DIR / "archive"
+ARCHIVE_PATH = ARCHIVE_DIR / "attendance_archive.db"
+ARCHIVE_KEEP_MONTHS = 1
+
 # --- Data Files ---
 ENCODINGS_PATH = MODELS_DIR / "encodings.pkl"  # <-- CHANGED to use MODELS_DIR
+ENCODINGS_ARRAY_PATH = MODELS_DIR / "encodings.npy"  # Full-precision copy (mmap)
+PROTOTYPES_PATH = MODELS_DIR / "prototypes.pkl"  # Compacted gallery (compact_gallery)
 ATTENDANCE_CSV_PATH = DATA_DIR / "attendance.csv"
 
+# --- Frame Source ---
+# Where 'capture' and 'run' read frames from (see src/frame_sources.py),
+# e.g. "webcam:0", "video:class.mp4", "images:folder", "synthetic", "replay:folder".
+FRAME_SOURCE = "webcam:0"
+
+# --- Face Detector ---
+# Which detector finds faces (see src/detectors.py): "hog", "haar" or "dnn".
+# 'run' and 'encode' can use different ones; --detector overrides both.
+DETECTOR_RUN = "hog"
+DETECTOR_ENCODE = "hog"
+
+# Model files for the "dnn" detector (OpenCV res10 300x300 SSD, Caffe format)
+DNN_PROTOTXT_PATH = MODELS_DIR / "face_detector" / "deploy.prototxt"
+DNN_MODEL_PATH = (
+    MODELS_DIR / "face_detector" / "res10_300x300_ssd_iter_140000.caffemodel"
+)
+DNN_CONFIDENCE = 0.5  # Ignore detections the model is less sure about
+
+# --- Frame Time Budget ---
+# Maximum time (milliseconds) 'run' spends encoding faces on one frame.
+# When a crowd arrives, the most useful faces are encoded first and the rest are
+# kept for the next frames (see src/scheduler.py). None = encode every face.
+FRAME_BUDGET_MS = None
+# With a budget, a face that is already recognised is not encoded again until
+# this many processed frames have passed (then it is re-checked once).
+REVERIFY_FRAMES = 30
+
+# --- Bulk Enrollment ---
+# 'enroll_bulk' checks and encodes photos in this many processes (None = all CPU cores).
+ENROLL_WORKERS = None
+ENROLL_MIN_FACE_SIZE = 80  # Reject photos where the face is smaller (pixels high)
+ENROLL_MAX_IMAGE_SIDE = 1600  # Big photos are shrunk to this before detection
+
+# --- Live View ---
+# How often the GUI's "Who's In" window checks the database for new rows.
+LIVE_VIEW_POLL_SECONDS = 1.0
+
 # --- Cooldown Setting ---
 ATTENDANCE_COOLDOWN_SECONDS = 10 * 60  # 10 minutes
 
@@ -35,3 +81,39 @@ ATTENDANCE_COOLDOWN_SECONDS = 10 * 60  # 10 minutes
 # For this simple project, we are loading settings directly from this Python file.
 # In a more advanced project, you could use this config.py file
 # to load and parse the config.yaml file.
+
+# --- Face Matching Settings ---
+# A face matches a student if its distance is at or below this value
+# (same default tolerance that face_recognition.compare_faces uses).
+MATCH_THRESHOLD = 0.6
+
+# Which search backend 'run' uses to compare faces against the gallery:
+#   "linear"  - exact search in the recognizer process (the original behaviour)
+#   "sharded" - exact search split across worker processes using shared memory
+MATCH_BACKEND = "linear"
+
+# Number of worker processes for the "sharded" backend (None = all CPU cores).
+MATCH_WORKERS = None
+
+# How many gallery rows each worker compares at once (keeps memory use bounded).
+MATCH_BLOCK_ROWS = 65536
+
+# How the recognizer keeps the gallery in memory:
+#   "float64" - full precision, 1 KB per sample (the original behaviour)
+#   "float16" - half precision, 256 bytes per sample
+#   "int8"    - 8-bit with a scale per dimension, 128 bytes per sample
+# With "float16"/"int8" the best RESCORE_CANDIDATES are re-scored at full precision
+# (read from ENCODINGS_ARRAY_PATH). Decisions can still change in rare cases;
+# benchmarks/bench_quantized.py counts them. These storages always run in one
+# process, so MATCH_BACKEND = "sharded" is ignored with them.
+GALLERY_STORAGE = "float64"
+RESCORE_CANDIDATES = 8
+
+# --- Prototype Gallery ---
+# 'compact_gallery' reduces each student's samples to a few prototypes: their
+# mean, plus real samples (medoids) for the photos the mean doesn't cover.
+# MATCH_PROTOTYPES = True (or 'run --prototypes') matches against those instead.
+MATCH_PROTOTYPES = False
+PROTOTYPE_DUPLICATE_DISTANCE = 0.1  # Samples closer than this are near-duplicates
+PROTOTYPE_COVER_DISTANCE = 0.3  # A sample is covered if a prototype is this close
+PROTOTYPE_MAX_PER_STUDENT = 4  # Mean + up to 3 medoids
@@ -5,35 +5,39 @@
 import sqlite3
 from datetime import datetime
 from config.config import DB_PATH, ATTENDANCE_COOLDOWN_SECONDS
+from src.partitions import last_attendance_time
 
 
-def mark_attendance(student_id, name):
+def mark_attendance(student_id, name, timestamp=None, db_path=DB_PATH):
     """
     Marks attendance for a given student_id.
     Includes a cooldown to prevent marking the same student multiple times
     in a short period (e.g., every frame).
+
+    'timestamp' is the time the frame was taken (a datetime). It defaults to now;
+    replays pass the recorded time so they always give the same results.
+
+    'db_path' is the database to write to. Replays use a scratch database
+    (see create_scratch_attendance_db), which has no archives to check.
     """
 
     conn = None
     try:
-        conn = sqlite3.connect(str(DB_PATH))
+        conn = sqlite3.connect(str(db_path))
         c = conn.cursor()
 
-        current_time = datetime.now()
+        current_time = timestamp or datetime.now()
         current_timestamp_str = current_time.strftime("%Y-%m-%d %H:%M:%S")
 
         # --- 1. Check for cooldown ---
         # Get the timestamp of the *last* time this student was marked.
-        c.execute(
-            "SELECT timestamp FROM attendance WHERE student_id = ? ORDER BY timestamp DESC LIMIT 1",
-            (student_id,),
-        )
-
-        last_entry = c.fetchone()  # Gets the most recent row, or None
+        # (Checks the current attendance table, and the newest archive if needed.)
+        last_timestamp_str = last_attendance_time(
+            c, student_id, check_archives=db_path == DB_PATH
+        )  # Or None
 
-        if last_entry:
+        if last_timestamp_str:
             # If a record exists, check the time difference
-            last_timestamp_str = last_entry[0]
             last_timestamp = datetime.strptime(last_timestamp_str, "%Y-%m-%d %H:%M:%S")
 
             time_diff_seconds = (current_time - last_timestamp).total_seconds()
@@ -4,13 +4,17 @@
 import cv2
 import os
 import sqlite3
-from config.config import KNOWN_FACES_DIR, DB_PATH
+from config.config import KNOWN_FACES_DIR, DB_PATH, FRAME_SOURCE
+from src.frame_sources import open_frame_source
 
 
-def run_capture():
+def run_capture(source=FRAME_SOURCE):
     """
     Captures and saves 10 face snapshots for a new student.
     Also adds the student's ID and name to the 'students' table in the database.
+
+    'source' is where frames come from (the webcam by default),
+    see src/frame_sources.py for the other options.
     """
 
     # 1. Get student info from the user
@@ -50,10 +54,10 @@ def run_capture():
     )  # 'exist_ok=True' prevents error if folder already exists
     print(f"Directory created at {student_dir}")
 
-    # --- 4. Initialize webcam ---
-    cap = cv2.VideoCapture(0)  # 0 is the default webcam
+    # --- 4. Initialize webcam (or the chosen frame source) ---
+    cap = open_frame_source(source)
     if not cap.isOpened():
-        print("Error: Could not open webcam.")
+        print(f"Error: Could not open frame source '{source}'.")
         return
 
     print("\nStarting webcam. Look at the camera.")
@@ -4,10 +4,22 @@
 import argparse
 
 # Import the main functions from our other modules
+from config.config import (
+    FRAME_SOURCE,
+    DETECTOR_RUN,
+    DETECTOR_ENCODE,
+    FRAME_BUDGET_MS,
+    MATCH_PROTOTYPES,
+)
+from src.detectors import DETECTOR_NAMES
 from src.db import create_database
 from src.captures import run_capture  # <-- CHANGED from "src.capture"
 from src.encode_faces import run_encode
-from src.recognizer import run_recognizer
+from src.recognizer import run_recognizer, ATTENDANCE_MODES
+from src.partitions import archive_attendance, compact_databases
+from src.sessions import add_session
+from src.prototypes import run_compact_gallery
+from src.enrollment import run_enroll_bulk
 
 
 def main():
@@ -24,15 +36,116 @@ def main():
     # Define the 'command' argument.
     parser.add_argument(
         "command",
-        choices=["init_db", "capture", "encode", "run"],
+        choices=[
+            "init_db",
+            "capture",
+            "encode",
+            "run",
+            "archive",
+            "compact",
+            "add_session",
+            "compact_gallery",
+            "enroll_bulk",
+        ],
         help="""The command to execute:
   init_db  - Initialize the database and create tables.
   capture  - Capture faces for a new student.
   encode   - Encode all known faces and save to .pkl file.
   run      - Start the real-time attendance recognizer.
+  archive  - Move old attendance rows into monthly archive tables.
+  compact  - VACUUM the database and archive files to free space.
+  add_session - Save a class session and its roster (--session, --roster, ...).
+  compact_gallery - Reduce each student's encodings to a few prototypes.
+  enroll_bulk - Enroll every student in a roster CSV from existing photos (--roster, --photos).
 """,
     )
 
+    # Options for 'capture' and 'run': where frames come from
+    parser.add_argument(
+        "--source",
+        default=FRAME_SOURCE,
+        help="""Frame source (default: %(default)s):
+  webcam:0             - a camera
+  video:FILE           - a video file
+  images:FOLDER        - every image in a folder
+  synthetic[:FOLDER]   - a generated test scene using faces from FOLDER
+  replay:FOLDER        - a session saved with --record
+""",
+    )
+    parser.add_argument(
+        "--detector",
+        choices=DETECTOR_NAMES,
+        help=f"(encode, run, enroll_bulk) Face detector to use (default: {DETECTOR_ENCODE} for "
+        f"encode, {DETECTOR_RUN} for run, set in config.py).",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="FOLDER",
+        help="(run) Save every frame and its timestamp to FOLDER for replay.",
+    )
+    parser.add_argument(
+        "--realtime",
+        action="store_true",
+        help="(run) Replay at the recorded speed instead of as fast as possible.",
+    )
+    parser.add_argument(
+        "--session",
+        help="(run, add_session) Class session ID. 'run' matches its roster first.",
+    )
+
+    # Options for 'add_session'
+    parser.add_argument(
+        "--name", help="(add_session) Session name, e.g. 'CS101 Lecture'."
+    )
+    parser.add_argument(
+        "--starts", help="(add_session) Start time, 'YYYY-MM-DD HH:MM:SS'."
+    )
+    parser.add_argument("--ends", help="(add_session) End time, 'YYYY-MM-DD HH:MM:SS'.")
+    parser.add_argument(
+        "--roster",
+        metavar="CSV",
+        help="(add_session) CSV with a 'student_id' column (or one ID per line).\n"
+        "(enroll_bulk) CSV with 'student_id' and 'name' columns.",
+    )
+    parser.add_argument(
+        "--photos",
+        metavar="FOLDER",
+        help="(enroll_bulk) Folder with a subfolder per student ID, or photos named "
+        "<ID>.jpg / <ID>_2.jpg.",
+    )
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=FRAME_BUDGET_MS,
+        help="(run) Time limit in ms for encoding faces per frame; "
+        "extra faces wait for the next frames.",
+    )
+    parser.add_argument(
+        "--prototypes",
+        action="store_true",
+        default=MATCH_PROTOTYPES,
+        help="(run) Match against the prototype gallery made by 'compact_gallery'.",
+    )
+    parser.add_argument(
+        "--attendance",
+        choices=ATTENDANCE_MODES,
+        help="""(run) Where attendance is written:
+  db      - students.db (default for a webcam)
+  scratch - a new temporary database (default for video, images, synthetic, replay)
+  off     - don't mark attendance
+""",
+    )
+    parser.add_argument(
+        "--keep-scratch",
+        action="store_true",
+        help="(run) Keep the scratch attendance database instead of deleting it at the end.",
+    )
+    parser.add_argument(
+        "--no-display",
+        action="store_true",
+        help="(run) Don't open a video window (for profiling and tests).",
+    )
+
     # Parse the arguments from the command line
     args = parser.parse_args()
 
@@ -44,15 +157,53 @@ def main():
 
     elif args.command == "capture":
         print("Running student capture...")
-        run_capture()  # <-- This function call remains the same
+        run_capture(source=args.source)
 
     elif args.command == "encode":
         print("Running face encoding...")
-        run_encode()
+        run_encode(detector=args.detector or DETECTOR_ENCODE)
 
     elif args.command == "run":
         print("Starting attendance system...")
-        run_recognizer()
+        run_recognizer(
+            source=args.source,
+            record_dir=args.record,
+            realtime=args.realtime,
+            display=not args.no_display,
+            detector=args.detector or DETECTOR_RUN,
+            session=args.session,
+            budget_ms=args.budget_ms,
+            prototypes=args.prototypes,
+            attendance=args.attendance,
+            keep_scratch=args.keep_scratch,
+        )
+
+    elif args.command == "archive":
+        print("Archiving old attendance...")
+        archive_attendance()
+
+    elif args.command == "compact":
+        print("Compacting databases...")
+        compact_databases()
+
+    elif args.command == "add_session":
+        if not args.session or not args.roster:
+            parser.error("add_session needs --session and --roster")
+        add_session(
+            args.session, args.name or args.session, args.starts, args.ends, args.roster
+        )
+
+    elif args.command == "compact_gallery":
+        print("Compacting the face gallery...")
+        run_compact_gallery()
+
+    elif args.command == "enroll_bulk":
+        if not args.roster or not args.photos:
+            parser.error("enroll_bulk needs --roster and --photos")
+        print("Enrolling students from photos...")
+        run_enroll_bulk(
+            args.roster, args.photos, detector=args.detector or DETECTOR_ENCODE
+        )
 
 
 if __name__ == "__main__":
@@ -2,15 +2,35 @@
 # We use Python's built-in sqlite3, so no extra servers are needed.
 
 import sqlite3
+import tempfile
 from sqlite3 import Error
 from config.config import DB_PATH  # Import the database path from our config file
 
+# The attendance log. Also used for the scratch databases that replays write to.
+CREATE_ATTENDANCE_TABLE = """
+CREATE TABLE IF NOT EXISTS attendance (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    FOREIGN KEY (student_id) REFERENCES students (student_id)
+);
+"""
+
+# Index for the "when was this student last marked?" lookup in mark_attendance,
+# so it doesn't have to scan the whole table.
+CREATE_ATTENDANCE_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_attendance_student_time
+ON attendance (student_id, timestamp);
+"""
+
 
 def create_database():
     """
     Creates the SQLite database and the required tables if they don't exist.
     'students' table: Stores student information.
     'attendance' table: Stores a log of every time a student is marked present.
+    'sessions' / 'session_roster' tables: Scheduled classes and who should attend them.
     """
 
     # SQL commands to create the tables.
@@ -22,12 +42,23 @@ def create_database():
     );
     """
 
-    create_attendance_table = """
-    CREATE TABLE IF NOT EXISTS attendance (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        student_id TEXT NOT NULL,
+    # Class sessions (scheduled lectures) and the students expected in each one.
+    # Used by 'run --session' to match against the roster first.
+    create_sessions_table = """
+    CREATE TABLE IF NOT EXISTS sessions (
+        session_id TEXT PRIMARY KEY,
         name TEXT NOT NULL,
-        timestamp TEXT NOT NULL,
+        starts_at TEXT,
+        ends_at TEXT
+    );
+    """
+
+    create_session_roster_table = """
+    CREATE TABLE IF NOT EXISTS session_roster (
+        session_id TEXT NOT NULL,
+        student_id TEXT NOT NULL,
+        PRIMARY KEY (session_id, student_id),
+        FOREIGN KEY (session_id) REFERENCES sessions (session_id),
         FOREIGN KEY (student_id) REFERENCES students (student_id)
     );
     """
@@ -42,13 +73,20 @@ def create_database():
         # Create a cursor object to execute SQL commands
         c = conn.cursor()
 
+        # WAL mode lets readers (like the GUI's live view) read while the
+        # recognizer is writing, without blocking each other. It is saved in the file.
+        c.execute("PRAGMA journal_mode=WAL")
+
         # Execute the SQL commands
         c.execute(create_students_table)
-        c.execute(create_attendance_table)
+        c.execute(CREATE_ATTENDANCE_TABLE)
+        c.execute(CREATE_ATTENDANCE_INDEX)
+        c.execute(create_sessions_table)
+        c.execute(create_session_roster_table)
 
         # Commit the changes to the database
         conn.commit()
-        print("Tables 'students' and 'attendance' created successfully.")
+        print("Tables 'students', 'attendance' and 'sessions' created successfully.")
 
     except Error as e:
         print(f"An error occurred: {e}")
@@ -60,6 +98,28 @@ def create_database():
             print("Database connection closed.")
 
 
+def create_scratch_attendance_db():
+    """
+    Creates a new, empty attendance database in the system's temp folder and
+    returns its path. Replays and test sources write here instead of
+    students.db, so they don't add made-up rows to the real attendance log,
+    and every replay starts from the same (empty) state.
+    """
+    handle = tempfile.NamedTemporaryFile(
+        prefix="attendance_scratch_", suffix=".db", delete=False
+    )
+    handle.close()
+
+    conn = sqlite3.connect(handle.name)
+    try:
+        conn.execute(CREATE_ATTENDANCE_TABLE)
+        conn.execute(CREATE_ATTENDANCE_INDEX)
+        conn.commit()
+    finally:
+        conn.close()
+    return handle.name
+
+
 # This block allows you to run this file directly to create the database.
 # e.g., 'python src/db.py'
 if __name__ == "__main__":
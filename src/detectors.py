@@ -0,0 +1,112 @@
+# This module provides the face detectors we can choose between.
+# Finding faces is the slowest step per frame, so it's worth having options:
+#   "hog"  - dlib HOG via face_recognition (the original; accurate but slow on CPU)
+#   "haar" - OpenCV Haar cascade (ships with cv2, very fast, more misses/false alarms)
+#   "dnn"  - OpenCV DNN with the small res10 SSD Caffe model (fast and accurate on CPU)
+#
+# Every detector has a detect(rgb_image) method that returns a list of
+# (top, right, bottom, left) boxes, the same format face_recognition uses,
+# so the boxes can be passed straight to face_recognition.face_encodings.
+
+import cv2
+import face_recognition
+from config.config import (
+    DNN_PROTOTXT_PATH,
+    DNN_MODEL_PATH,
+    DNN_CONFIDENCE,
+)
+
+DETECTOR_NAMES = ("hog", "haar", "dnn")
+
+
+class HogDetector:
+    """dlib's HOG detector (what face_recognition.face_locations uses by default)."""
+
+    name = "hog"
+
+    def __init__(self, upsample=1):
+        self.upsample = upsample
+
+    def detect(self, rgb_image):
+        return face_recognition.face_locations(
+            rgb_image, number_of_times_to_upsample=self.upsample, model="hog"
+        )
+
+
+class HaarDetector:
+    """OpenCV's frontal-face Haar cascade. The XML file is included with cv2."""
+
+    name = "haar"
+
+    def __init__(self, scale_factor=1.1, min_neighbors=5, min_size=20):
+        cascade_path = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+        self.cascade = cv2.CascadeClassifier(cascade_path)
+        if self.cascade.empty():
+            raise RuntimeError(f"Could not load Haar cascade from {cascade_path}")
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = (min_size, min_size)
+
+    def detect(self, rgb_image):
+        gray = cv2.cvtColor(rgb_image, cv2.COLOR_RGB2GRAY)
+        boxes = self.cascade.detectMultiScale(
+            gray,
+            scaleFactor=self.scale_factor,
+            minNeighbors=self.min_neighbors,
+            minSize=self.min_size,
+        )
+        # OpenCV gives (x, y, width, height)
+        return [(int(y), int(x + w), int(y + h), int(x)) for (x, y, w, h) in boxes]
+
+
+class DnnDetector:
+    """
+    OpenCV DNN running the res10 300x300 SSD face model (about 10 MB, CPU only).
+    The two model files must be in data/models/face_detector/ (see README).
+    """
+
+    name = "dnn"
+
+    def __init__(self, confidence=DNN_CONFIDENCE):
+        if not DNN_PROTOTXT_PATH.exists() or not DNN_MODEL_PATH.exists():
+            raise RuntimeError(
+                f"DNN face model not found. Put deploy.prototxt and the .caffemodel "
+                f"in {DNN_MODEL_PATH.parent} (see README)."
+            )
+        self.net = cv2.dnn.readNetFromCaffe(str(DNN_PROTOTXT_PATH), str(DNN_MODEL_PATH))
+        self.confidence = confidence
+
+    def detect(self, rgb_image):
+        height, width = rgb_image.shape[:2]
+
+        # The model was trained on 300x300 BGR images with these channel means;
+        # swapRB=True turns our RGB image into BGR while building the blob.
+        blob = cv2.dnn.blobFromImage(
+            rgb_image, 1.0, (300, 300), (104.0, 177.0, 123.0), swapRB=True
+        )
+        self.net.setInput(blob)
+        detections = self.net.forward()  # shape (1, 1, N, 7)
+
+        boxes = []
+        for detection in detections[0, 0]:
+            if detection[2] < self.confidence:
+                continue
+            # Box corners are given as fractions of the image size
+            left = max(0, int(detection[3] * width))
+            top = max(0, int(detection[4] * height))
+            right = min(width, int(detection[5] * width))
+            bottom = min(height, int(detection[6] * height))
+            if right > left and bottom > top:
+                boxes.append((top, right, bottom, left))
+        return boxes
+
+
+def create_detector(name):
+    """Builds the detector called 'name' ("hog", "haar" or "dnn")."""
+    if name == "hog":
+        return HogDetector()
+    if name == "haar":
+        return HaarDetector()
+    if name == "dnn":
+        return DnnDetector()
+    raise ValueError(f"Unknown face detector: {name}")
@@ -6,10 +6,19 @@ import face_recognition
 import pickle
 import os
 import sqlite3
-from config.config import KNOWN_FACES_DIR, ENCODINGS_PATH, DB_PATH
-
-
-def run_encode():
+import numpy as np
+from config.config import (
+    KNOWN_FACES_DIR,
+    ENCODINGS_PATH,
+    ENCODINGS_ARRAY_PATH,
+    DB_PATH,
+    DETECTOR_ENCODE,
+    PROTOTYPES_PATH,
+)
+from src.detectors import create_detector
+
+
+def run_encode(detector=DETECTOR_ENCODE):
     """
     Loops through all student images, generates facial encodings for each,
     and saves the encodings along with their corresponding names and IDs
@@ -17,14 +26,23 @@ def run_encode():
 
     This 'pickle' file is a binary file that stores your Python object
     (in this case, a dictionary) so you can load it quickly later.
+
+    'detector' is the face detector used to find the face in each image
+    ("hog", "haar" or "dnn", see src/detectors.py).
     """
 
-    print("Starting face encoding...")
+    print(f"Starting face encoding (detector: {detector})...")
+    try:
+        face_detector = create_detector(detector)
+    except (RuntimeError, ValueError) as e:
+        print(f"Error: {e}")
+        return
 
     # These lists will store all the encodings and their matching names/IDs
     known_face_encodings = []
     known_student_ids = []
     known_names = []
+    known_paths = []  # Source image of each encoding (relative to KNOWN_FACES_DIR)
 
     # --- 1. Get student data from the database ---
     # This is better than just using folder names, as it's the "single source of truth".
@@ -58,10 +76,11 @@ def run_encode():
             # Load the image file
             image = face_recognition.load_image_file(str(img_path))
 
-            # Find face encodings.
+            # Find the faces with the chosen detector, then encode them.
             # This returns a list of encodings for all faces found in the image.
             # We assume there is only ONE face per image (the student's).
-            encodings = face_recognition.face_encodings(image)
+            face_locations = face_detector.detect(image)
+            encodings = face_recognition.face_encodings(image, face_locations)
 
             if encodings:
                 # Get the first (and hopefully only) encoding
@@ -71,6 +90,7 @@ def run_encode():
                 known_face_encodings.append(encoding)
                 known_student_ids.append(student_id)
                 known_names.append(name)
+                known_paths.append(str(img_path.relative_to(KNOWN_FACES_DIR)))
             else:
                 print(f"  WARNING: No face found in {img_path}. Skipping.")
 
@@ -78,19 +98,27 @@ def run_encode():
 
     # --- 3. Save the lists to a pickle file ---
 
-    # We store all three lists in a dictionary for easy loading
+    # We store all the lists in a dictionary for easy loading
     data = {
         "encodings": known_face_encodings,
         "ids": known_student_ids,
         "names": known_names,
+        "paths": known_paths,
     }
 
     # 'wb' means 'write binary' mode, which pickle requires
     with open(ENCODINGS_PATH, "wb") as f:
         pickle.dump(data, f)
 
+    # Also save a plain (num_samples x 128) array next to it.
+    # The recognizer can memory-map this file to re-score candidates at full
+    # precision when it keeps a compact float16/int8 gallery in RAM.
+    np.save(ENCODINGS_ARRAY_PATH, np.array(known_face_encodings).reshape(-1, 128))
+
     print(f"Encodings saved successfully to {ENCODINGS_PATH}")
     print("You can now run the 'run' command.")
+    if PROTOTYPES_PATH.exists():
+        print("Run 'compact_gallery' again to update the prototype gallery.")
 
 
 if __name__ == "__main__":
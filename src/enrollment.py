@@ -0,0 +1,413 @@
+# This module enrolls many students at once from existing photos
+# (the 'enroll_bulk' command), instead of one 'capture' + webcam per student.
+#
+#   python src/cli.py enroll_bulk --roster intake.csv --photos photos/
+#
+# The roster CSV needs 'student_id' and 'name' columns. Photos can be in one
+# folder per student (photos/S123/*.jpg) or all in one folder, named after
+# the student (photos/S123.jpg, photos/S123_2.jpg).
+#
+# The steps:
+#   1. All roster students are added to the database in one transaction.
+#   2. Worker processes check each photo (exactly one big enough face) and
+#      encode it. Accepted photos are copied into data/known_faces/<id>/.
+#   3. The new encodings are added to encodings.pkl / encodings.npy. Each file
+#      is written to a temporary file first and then swapped in, so 'run'
+#      never sees a half-written gallery.
+
+import csv
+import os
+import pickle
+import sqlite3
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+import cv2
+import face_recognition
+import numpy as np
+from PIL import Image
+from config.config import (
+    DB_PATH,
+    KNOWN_FACES_DIR,
+    ENCODINGS_PATH,
+    ENCODINGS_ARRAY_PATH,
+    PROTOTYPES_PATH,
+    DETECTOR_ENCODE,
+    ENROLL_WORKERS,
+    ENROLL_MIN_FACE_SIZE,
+    ENROLL_MAX_IMAGE_SIDE,
+)
+from src.detectors import create_detector
+from src.matcher import single_thread_pool
+from src.frame_sources import IMAGE_EXTENSIONS
+
+# Copies made by 'enroll_bulk' start with this, so they never clash with the
+# 1.jpg ... 10.jpg files saved by 'capture'.
+COPY_PREFIX = "bulk_"
+
+
+def copy_name(source):
+    """
+    Name of the copy of 'source' in known_faces: 'a.png' -> 'bulk_a_png.jpg'.
+    The original extension is kept in the name, so a.jpg and a.png get
+    different copies even though both are saved as .jpg.
+    """
+    return f"{COPY_PREFIX}{source.stem}_{source.suffix.lstrip('.')}.jpg"
+
+
+# --- 1. Reading the roster and finding the photos ---
+
+
+def read_enrollment_roster(roster_path):
+    """
+    Reads (student_id, name) pairs from a CSV with 'student_id' and 'name' columns.
+    Returns (students, problems): rows with a missing value or a repeated ID
+    are left out and described in 'problems'.
+    """
+    students = []
+    problems = []
+    seen = set()
+
+    with open(roster_path, newline="") as f:
+        reader = csv.DictReader(f)
+        header = [column.strip().lower() for column in reader.fieldnames or []]
+        if "student_id" not in header or "name" not in header:
+            raise ValueError(f"{roster_path} needs 'student_id' and 'name' columns")
+        reader.fieldnames = header
+
+        for line, row in enumerate(reader, start=2):
+            student_id = (row["student_id"] or "").strip()
+            name = (row["name"] or "").strip()
+            if not student_id or not name:
+                problems.append(f"line {line}: missing student_id or name")
+            elif student_id in seen:
+                problems.append(f"line {line}: {student_id} is listed twice")
+            else:
+                seen.add(student_id)
+                students.append((student_id, name))
+
+    return students, problems
+
+
+def find_photos(photos_dir, student_ids):
+    """
+    Returns {student_id: [photo paths]} for the students in 'student_ids'.
+    Looks in photos_dir/<id>/ first, then for photos_dir/<id>.jpg or <id>_*.jpg.
+    """
+    photos_dir = Path(photos_dir)
+    wanted = set(student_ids)
+
+    # Index the loose files once instead of searching the folder per student
+    loose = {}
+    for path in sorted(photos_dir.iterdir()):
+        if path.is_file() and path.suffix.lower() in IMAGE_EXTENSIONS:
+            owner = path.stem if path.stem in wanted else path.stem.rsplit("_", 1)[0]
+            loose.setdefault(owner, []).append(path)
+
+    photos = {}
+    for student_id in student_ids:
+        folder = photos_dir / student_id
+        if folder.is_dir():
+            photos[student_id] = sorted(
+                p for p in folder.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS
+            )
+        else:
+            photos[student_id] = loose.get(student_id, [])
+    return photos
+
+
+def add_students(students):
+    """
+    Adds all students in one transaction. Students that are already enrolled
+    keep their current name. Returns (number of new students, {student_id: name}),
+    where the names are the ones now in the database, to use in the gallery.
+    """
+    conn = None
+    try:
+        conn = sqlite3.connect(str(DB_PATH))
+        c = conn.cursor()
+        before = c.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+        c.executemany(
+            "INSERT OR IGNORE INTO students (student_id, name) VALUES (?, ?)",
+            students,
+        )
+        after = c.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+        wanted = {student_id for student_id, _ in students}
+        names = {
+            student_id: name
+            for student_id, name in c.execute("SELECT student_id, name FROM students")
+            if student_id in wanted
+        }
+        conn.commit()
+        return after - before, names
+    finally:
+        if conn:
+            conn.close()
+
+
+# --- 2. Checking and encoding photos (runs in the worker processes) ---
+
+# Each worker creates its detector once (in _start_worker), not once per photo
+_worker_detector = None
+_worker_error = None
+
+
+def _start_worker(detector_name):
+    """
+    Pool initializer: loads the face detector in this worker.
+    It must not raise: the pool would start a new worker to replace this
+    one, fail again, and hang forever. The error is reported per photo instead.
+    """
+    global _worker_detector, _worker_error
+    # One OpenCV thread per worker: the workers already use every core between
+    # them (BLAS is limited to one thread by single_thread_pool)
+    cv2.setNumThreads(1)
+    try:
+        _worker_detector = create_detector(detector_name)
+    except Exception as e:
+        _worker_error = f"detector error: {e}"
+
+
+def _encode_photo(task):
+    """
+    Checks and encodes one photo, and copies it into known_faces if accepted.
+    Returns (task, encoding, reason): 'encoding' is None and 'reason' says
+    why when the photo is rejected.
+    """
+    if _worker_error:
+        return task, None, _worker_error
+    # One bad photo (or a full disk while copying) must not stop the whole run
+    try:
+        return _check_photo(task)
+    except Exception as e:
+        return task, None, f"error: {e}"
+
+
+def _check_photo(task):
+    """The checks done by _encode_photo."""
+    student_id, source, destination = task
+
+    try:
+        image = face_recognition.load_image_file(str(source))
+    except Exception:
+        return task, None, "unreadable image"
+
+    # Shrink very big photos; detection time grows with the number of pixels
+    height, width = image.shape[:2]
+    scale = ENROLL_MAX_IMAGE_SIDE / max(height, width)
+    if scale < 1:
+        image = cv2.resize(
+            image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA
+        )
+
+    face_locations = _worker_detector.detect(image)
+    if not face_locations:
+        return task, None, "no face found"
+    if len(face_locations) > 1:
+        return task, None, "more than one face"
+
+    top, right, bottom, left = face_locations[0]
+    if bottom - top < ENROLL_MIN_FACE_SIZE:
+        return task, None, "face too small"
+
+    encodings = face_recognition.face_encodings(image, face_locations)
+    if not encodings:
+        return task, None, "face could not be encoded"
+
+    # 'encode' only reads .jpg files, so other formats are converted.
+    # atomic_write means a failed copy never leaves a broken file behind.
+    os.makedirs(destination.parent, exist_ok=True)
+    if source.suffix.lower() == ".jpg":
+        atomic_write(destination, lambda f: f.write(source.read_bytes()))
+    else:
+        converted = Image.open(source).convert("RGB")
+        atomic_write(destination, lambda f: converted.save(f, "JPEG", quality=95))
+
+    return task, encodings[0], None
+
+
+# --- 3. Adding the encodings to the gallery ---
+
+
+def atomic_write(path, write):
+    """
+    Calls write(file) on a temporary file next to 'path', then renames it over
+    'path'. The rename is atomic, so readers see either the old or the new file.
+    """
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def load_gallery():
+    """Returns the current encodings.pkl dictionary (empty lists if there is none)."""
+    if not ENCODINGS_PATH.exists():
+        return {"encodings": [], "ids": [], "names": [], "paths": []}
+    with open(ENCODINGS_PATH, "rb") as f:
+        data = pickle.load(f)
+    # Pickles from before 'paths' was saved
+    data.setdefault("paths", [None] * len(data["ids"]))
+    return data
+
+
+def append_to_gallery(new_encodings, new_ids, new_names, new_paths):
+    """Adds encodings to encodings.pkl and rewrites encodings.npy to match."""
+    data = load_gallery()
+    data["encodings"] = list(data["encodings"]) + list(new_encodings)
+    data["ids"] = list(data["ids"]) + new_ids
+    data["names"] = list(data["names"]) + new_names
+    data["paths"] = list(data["paths"]) + new_paths
+
+    os.makedirs(ENCODINGS_PATH.parent, exist_ok=True)
+    # The .npy first: if we stop in between, the recognizer sees that it doesn't
+    # match the pickle and falls back to the pickle (see load_rescore_source)
+    array = np.array(data["encodings"]).reshape(-1, 128)
+    atomic_write(ENCODINGS_ARRAY_PATH, lambda f: np.save(f, array))
+    atomic_write(ENCODINGS_PATH, lambda f: pickle.dump(data, f))
+    return len(data["ids"])
+
+
+# --- The 'enroll_bulk' command ---
+
+
+def run_enroll_bulk(
+    roster_path, photos_dir, detector=DETECTOR_ENCODE, workers=ENROLL_WORKERS
+):
+    """
+    Enrolls every student in 'roster_path' using their photos in 'photos_dir'
+    and prints a summary (throughput and rejected photos with reasons).
+    """
+    start = time.perf_counter()
+
+    # --- 1. Detector, roster, photos and database ---
+    # Build the detector here once, so a missing model file is reported
+    # before anything is written (the workers build their own copy)
+    try:
+        create_detector(detector)
+    except (RuntimeError, ValueError) as e:
+        print(f"Error: {e}")
+        return
+
+    try:
+        students, problems = read_enrollment_roster(roster_path)
+    except (OSError, ValueError) as e:
+        print(f"Error reading roster: {e}")
+        return
+    for problem in problems:
+        print(f"  WARNING: roster {problem}")
+    if not students:
+        print("No students to enroll.")
+        return
+
+    if not Path(photos_dir).is_dir():
+        print(f"Error: Photo folder {photos_dir} not found.")
+        return
+    photos = find_photos(photos_dir, [student_id for student_id, _ in students])
+
+    try:
+        added, names = add_students(students)
+    except sqlite3.Error as e:
+        print(f"Database error: {e}. Nothing was enrolled.")
+        return
+    print(
+        f"{len(students)} students in the roster: {added} added to the database, "
+        f"{len(students) - added} were already enrolled."
+    )
+    renamed = [sid for sid, name in students if names[sid] != name]
+    if renamed:
+        print(
+            f"  Note: {len(renamed)} already enrolled students have another name in "
+            f"the database, which is kept: {renamed[:10]}"
+        )
+
+    # --- 2. Check and encode the photos in parallel ---
+    tasks = []
+    rejected = []  # (photo, reason)
+    skipped = 0
+    already = set()  # students with photos from an earlier run
+    # Photos whose copy is already in the gallery were enrolled by an earlier run.
+    # (A copy that is not in the gallery, e.g. from an interrupted run, is redone.)
+    in_gallery = set(load_gallery()["paths"])
+    for student_id, _ in students:
+        for source in photos[student_id]:
+            destination = KNOWN_FACES_DIR / student_id / copy_name(source)
+            if str(destination.relative_to(KNOWN_FACES_DIR)) in in_gallery:
+                skipped += 1
+                already.add(student_id)
+            else:
+                tasks.append((student_id, source, destination))
+
+    workers = workers or os.cpu_count() or 1
+    print(f"Checking and encoding {len(tasks)} photos with {workers} processes...")
+    encode_start = time.perf_counter()
+
+    accepted = []  # (student_id, encoding, destination)
+    with single_thread_pool(workers, _start_worker, (detector,)) as pool:
+        # Results come back as soon as they are ready, so we can show progress
+        for done, (task, encoding, reason) in enumerate(
+            pool.imap_unordered(_encode_photo, tasks, chunksize=4), start=1
+        ):
+            student_id, source, destination = task
+            if encoding is None:
+                rejected.append((source, reason))
+            else:
+                accepted.append((student_id, encoding, destination))
+            if done % 100 == 0:
+                print(f"  {done}/{len(tasks)} photos done")
+
+    encode_time = time.perf_counter() - encode_start
+
+    # --- 3. Add them to the gallery in one step ---
+    # Keep the roster order, so each student's encodings are next to each other
+    order = {student_id: i for i, (student_id, _) in enumerate(students)}
+    accepted.sort(key=lambda item: (order[item[0]], str(item[2])))
+    if accepted:
+        total = append_to_gallery(
+            [encoding for _, encoding, _ in accepted],
+            [student_id for student_id, _, _ in accepted],
+            [names[student_id] for student_id, _, _ in accepted],
+            [str(path.relative_to(KNOWN_FACES_DIR)) for _, _, path in accepted],
+        )
+        print(f"Gallery updated: {total} encodings in {ENCODINGS_PATH}")
+
+    # --- Summary ---
+    enrolled = {student_id for student_id, _, _ in accepted} | already
+    without_photos = [sid for sid, _ in students if not photos[sid]]
+    tried = {student_id for student_id, _, _ in tasks}
+    all_rejected = [sid for sid, _ in students if sid in tried and sid not in enrolled]
+    elapsed = time.perf_counter() - start
+
+    print("\n--- Bulk enrollment summary ---")
+    print(
+        f"Photos: {len(tasks) + skipped} found, {len(accepted)} accepted, "
+        f"{len(rejected)} rejected, {skipped} already enrolled earlier"
+    )
+    print(
+        f"Encoding: {len(tasks)} photos in {encode_time:.1f}s "
+        f"({len(tasks) / max(encode_time, 1e-9):.1f} photos/s), total {elapsed:.1f}s"
+    )
+    if rejected:
+        print("Rejected photos by reason:")
+        for reason, count in Counter(reason for _, reason in rejected).most_common():
+            print(f"  {reason}: {count}")
+        for source, reason in rejected[:20]:
+            print(f"    {source} ({reason})")
+        if len(rejected) > 20:
+            print(f"    ... and {len(rejected) - 20} more")
+    if without_photos:
+        print(
+            f"WARNING: {len(without_photos)} students have no photos: {without_photos[:10]}"
+        )
+    if all_rejected:
+        print(
+            f"WARNING: {len(all_rejected)} students had every photo rejected: "
+            f"{all_rejected[:10]}"
+        )
+    if accepted and PROTOTYPES_PATH.exists():
+        print("Run 'compact_gallery' again to update the prototype gallery.")
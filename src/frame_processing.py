@@ -0,0 +1,101 @@
+# This module prepares each video frame for face detection without
+# allocating new arrays every time.
+#
+# The simple way (cv2.resize(...) then [:, :, ::-1]) makes a new small frame
+# on every processed frame, and the reversed-channel view is not contiguous,
+# so dlib has to copy it again internally. At 30 FPS that is a lot of memory
+# churn. Here we allocate the buffers once and let OpenCV write into them.
+
+import cv2
+import numpy as np
+import face_recognition
+from src.detectors import HogDetector
+
+
+class FrameProcessor:
+    """
+    Holds the reusable buffers for one video stream:
+      - 'frame'      : full-size frame the source reads into (if it supports it)
+      - 'small'      : the resized BGR frame
+      - 'rgb'        : the resized frame in RGB, C-contiguous (what dlib wants)
+      - 'locations'  : (max_faces, 4) face boxes of the last processed frame
+      - 'encodings'  : (max_faces, 128) encodings of the last processed frame
+    Buffers are only re-created if the frame size changes, or if a frame has
+    more faces than 'max_faces' (then the face buffers grow; no face is dropped).
+    'detector' is one of the detectors from src/detectors.py (HOG by default).
+    """
+
+    def __init__(self, scale=0.25, max_faces=32, detector=None):
+        self.scale = scale
+        self.detector = detector or HogDetector()
+        self.max_faces = max_faces
+        self.frame = None
+        self.small = None
+        self.rgb = None
+        self.locations = np.zeros((max_faces, 4), dtype=np.int32)
+        self.encodings = np.zeros((max_faces, 128), dtype=np.float64)
+        self.num_faces = 0
+
+    def read(self, source):
+        """Reads the next frame from 'source' into the reused full-size buffer."""
+        ret, frame = source.read(self.frame)
+        if ret:
+            # Sources that can't fill our buffer return a new array; keep using it
+            self.frame = frame
+        return ret, frame
+
+    def prepare(self, frame):
+        """
+        Resizes 'frame' and converts it to RGB into the reused buffers.
+        Returns the RGB buffer (valid until the next call).
+        """
+        height, width = frame.shape[:2]
+        small_size = (int(round(width * self.scale)), int(round(height * self.scale)))
+
+        if self.small is None or self.small.shape[:2] != (small_size[1], small_size[0]):
+            self.small = np.empty((small_size[1], small_size[0], 3), dtype=np.uint8)
+            self.rgb = np.empty_like(self.small)
+
+        # Same result as cv2.resize(frame, (0, 0), fx=0.25, fy=0.25), but written
+        # into 'self.small' instead of a new array
+        cv2.resize(frame, small_size, dst=self.small)
+        cv2.cvtColor(self.small, cv2.COLOR_BGR2RGB, dst=self.rgb)
+        return self.rgb
+
+    def detect_and_encode(self, rgb, face_locations=None):
+        """
+        Finds faces in 'rgb' (unless 'face_locations' is given) and encodes them.
+        Results are copied into the reused 'locations'/'encodings' arrays, and
+        views of the filled part are returned.
+        """
+        if face_locations is None:
+            face_locations = self.detector.detect(rgb)
+        self.reserve(len(face_locations))
+
+        encodings = face_recognition.face_encodings(rgb, face_locations)
+
+        self.num_faces = len(face_locations)
+        if self.num_faces:
+            self.locations[: self.num_faces] = face_locations
+            self.encodings[: self.num_faces] = encodings
+
+        return self.locations[: self.num_faces], self.encodings[: self.num_faces]
+
+    def reserve(self, num_faces):
+        """Grows the face buffers (to at least double) if 'num_faces' won't fit."""
+        if num_faces <= self.max_faces:
+            return
+        self.max_faces = max(num_faces, 2 * self.max_faces)
+        self.locations = np.zeros((self.max_faces, 4), dtype=np.int32)
+        self.encodings = np.zeros((self.max_faces, 128), dtype=np.float64)
+
+    def full_size_box(self, location):
+        """Scales a (top, right, bottom, left) box on the small frame back up."""
+        factor = 1.0 / self.scale
+        top, right, bottom, left = location
+        return (
+            int(top * factor),
+            int(right * factor),
+            int(bottom * factor),
+            int(left * factor),
+        )
@@ -0,0 +1,283 @@
+# This module provides the "frame sources" that capture and run read video from.
+# Before, both commands always opened cv2.VideoCapture(0). Now they can also read
+# a video file, a folder of images, a synthetic test scene, or a recorded session,
+# which makes it possible to benchmark and debug on a machine without a camera.
+#
+# Every source works like cv2.VideoCapture (read / isOpened / release; read may be
+# given an array to reuse, which the camera and video sources fill in), and also
+# has a 'timestamp' attribute: the time (seconds since 1970) of the last frame read,
+# and a 'live' attribute: True only for a real camera.
+
+import csv
+import os
+import time
+import cv2
+import numpy as np
+from pathlib import Path
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+# Synthetic and image-folder sources pretend their first frame was taken at this
+# time (2026-01-05 09:00:00 UTC), so every run produces the same timestamps.
+FIXED_START_TIME = 1767603600.0
+
+
+# --- 1. Live webcam ---
+
+
+class WebcamSource:
+    """A real camera. Timestamps are the wall-clock time each frame was read."""
+
+    live = True
+
+    def __init__(self, index=0):
+        self.capture = cv2.VideoCapture(index)
+        self.timestamp = None
+
+    def isOpened(self):
+        return self.capture.isOpened()
+
+    def read(self, image=None):
+        # 'image' lets the caller pass a buffer to reuse instead of a new array
+        ret, frame = self.capture.read(image)
+        self.timestamp = time.time()
+        return ret, frame
+
+    def release(self):
+        self.capture.release()
+
+
+# --- 2. Video file ---
+
+
+class VideoFileSource:
+    """A video file. Timestamps come from the video's own frame times."""
+
+    live = False
+
+    def __init__(self, path):
+        self.capture = cv2.VideoCapture(str(path))
+        self.start_time = FIXED_START_TIME
+        self.timestamp = None
+
+    def isOpened(self):
+        return self.capture.isOpened()
+
+    def read(self, image=None):
+        ret, frame = self.capture.read(image)
+        position_ms = self.capture.get(cv2.CAP_PROP_POS_MSEC)
+        self.timestamp = self.start_time + position_ms / 1000.0
+        return ret, frame
+
+    def release(self):
+        self.capture.release()
+
+
+# --- 3. Folder of images ---
+
+
+class ImageFolderSource:
+    """Every image in a folder (sorted by name), played as if taken at 'fps'."""
+
+    live = False
+
+    def __init__(self, folder, fps=10.0):
+        self.paths = sorted(
+            p for p in Path(folder).glob("*") if p.suffix.lower() in IMAGE_EXTENSIONS
+        )
+        self.fps = fps
+        self.position = 0
+        self.timestamp = None
+
+    def isOpened(self):
+        return len(self.paths) > 0
+
+    def read(self, image=None):
+        if self.position >= len(self.paths):
+            return False, None
+
+        frame = cv2.imread(str(self.paths[self.position]))
+        self.timestamp = FIXED_START_TIME + self.position / self.fps
+        self.position += 1
+        return frame is not None, frame
+
+    def release(self):
+        pass
+
+
+# --- 4. Synthetic generator ---
+
+
+class SyntheticSource:
+    """
+    Generates a repeatable test scene: a noisy background with face images
+    (taken from 'faces_folder', e.g. data/known_faces) sliding across it.
+    The same seed always gives exactly the same frames.
+    """
+
+    live = False
+
+    def __init__(
+        self, faces_folder=None, num_frames=300, width=640, height=480, fps=30.0, seed=0
+    ):
+        self.num_frames = num_frames
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.rng = np.random.default_rng(seed)
+        self.position = 0
+        self.timestamp = None
+
+        # Load up to 4 face images, shrunk to fit in the frame
+        self.faces = []
+        if faces_folder:
+            paths = sorted(
+                p
+                for p in Path(faces_folder).rglob("*")
+                if p.suffix.lower() in IMAGE_EXTENSIONS
+            )
+            for path in paths[:4]:
+                face = cv2.imread(str(path))
+                if face is None:
+                    continue
+                size = min(height // 2, width // 3)
+                scale = size / max(face.shape[:2])
+                self.faces.append(cv2.resize(face, (0, 0), fx=scale, fy=scale))
+
+    def isOpened(self):
+        return True
+
+    def read(self, image=None):
+        if self.position >= self.num_frames:
+            return False, None
+
+        frame = self.rng.integers(
+            60, 90, size=(self.height, self.width, 3), dtype=np.uint8
+        )
+
+        # Each face moves from left to right at its own height
+        for i, face in enumerate(self.faces):
+            face_h, face_w = face.shape[:2]
+            travel = self.width - face_w
+            x = (self.position * 4 + i * travel // 2) % max(travel, 1)
+            y = (i * self.height // 4) % max(self.height - face_h, 1)
+            frame[y : y + face_h, x : x + face_w] = face
+
+        self.timestamp = FIXED_START_TIME + self.position / self.fps
+        self.position += 1
+        return True, frame
+
+    def release(self):
+        pass
+
+
+# --- 5. Replay of a recorded session ---
+
+
+class ReplaySource:
+    """
+    Plays back a folder written by SessionRecorder.
+    realtime=True waits between frames like the original session did;
+    realtime=False returns frames as fast as possible (for profiling).
+    Either way the frames and timestamps are exactly the recorded ones.
+    """
+
+    live = False
+
+    def __init__(self, session_folder, realtime=False):
+        self.folder = Path(session_folder)
+        self.realtime = realtime
+        self.entries = []
+        self.position = 0
+        self.timestamp = None
+        self.replay_started = None
+
+        index_path = self.folder / "timestamps.csv"
+        if index_path.exists():
+            with open(index_path, newline="") as f:
+                for row in csv.DictReader(f):
+                    self.entries.append((row["file"], float(row["timestamp"])))
+
+    def isOpened(self):
+        return len(self.entries) > 0
+
+    def read(self, image=None):
+        if self.position >= len(self.entries):
+            return False, None
+
+        file_name, timestamp = self.entries[self.position]
+
+        if self.realtime:
+            # Sleep until this frame is "due", measured from the first frame
+            if self.replay_started is None:
+                self.replay_started = time.perf_counter()
+            due = self.replay_started + (timestamp - self.entries[0][1])
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        frame = cv2.imread(str(self.folder / file_name))
+        self.timestamp = timestamp
+        self.position += 1
+        return frame is not None, frame
+
+    def release(self):
+        pass
+
+
+# --- Session recorder ---
+
+
+class SessionRecorder:
+    """
+    Saves frames plus their timestamps so a session can be replayed later.
+    Frames are stored as PNG (lossless), so a replay gives identical pixels.
+    """
+
+    def __init__(self, session_folder):
+        self.folder = Path(session_folder)
+        os.makedirs(self.folder, exist_ok=True)
+        self.count = 0
+        self.index_file = open(self.folder / "timestamps.csv", "w", newline="")
+        self.writer = csv.writer(self.index_file)
+        self.writer.writerow(["file", "timestamp"])
+
+    def write(self, frame, timestamp):
+        file_name = f"{self.count:06d}.png"
+        cv2.imwrite(str(self.folder / file_name), frame)
+        self.writer.writerow([file_name, f"{timestamp:.6f}"])
+        self.count += 1
+
+    def close(self):
+        self.index_file.close()
+        print(f"Recorded {self.count} frames to {self.folder}")
+
+
+# --- Choosing a source from a text description ---
+
+
+def open_frame_source(spec="webcam:0", realtime=False):
+    """
+    Creates a frame source from a string like:
+      "webcam" or "webcam:1"   - camera number 0 or 1
+      "video:path/to/file.mp4" - a video file
+      "images:path/to/folder"  - every image in a folder
+      "synthetic" or "synthetic:data/known_faces" - generated test scene
+      "replay:path/to/session" - a session saved with --record
+    'realtime' only matters for replay.
+    """
+
+    kind, _, argument = spec.partition(":")
+
+    if kind == "webcam":
+        return WebcamSource(int(argument) if argument else 0)
+    if kind == "video":
+        return VideoFileSource(argument)
+    if kind == "images":
+        return ImageFolderSource(argument)
+    if kind == "synthetic":
+        return SyntheticSource(argument or None)
+    if kind == "replay":
+        return ReplaySource(argument, realtime=realtime)
+
+    raise ValueError(f"Unknown frame source: {spec}")
@@ -8,7 +8,9 @@ import threading  # To run scripts in a new thread so the GUI doesn't freeze
 import sys
 import csv
 import sqlite3
-from config.config import DB_PATH, ATTENDANCE_CSV_PATH, BASE_DIR
+from config.config import ATTENDANCE_CSV_PATH, BASE_DIR
+from src.partitions import open_all_attendance
+from src.live_view import LiveAttendanceWindow
 
 # --- Helper Function to run scripts ---
 
@@ -79,16 +81,20 @@ def gui_run_recognizer():
 
 
 def gui_export_csv():
-    """Exports the 'attendance' table from the database to a CSV file."""
+    """
+    Exports all attendance (current and archived) from the database to a CSV file.
+    Rows are written as they are read, so a big history doesn't fill up memory.
+    """
     print("Exporting attendance to CSV...")
     try:
-        conn = sqlite3.connect(str(DB_PATH))
+        # This connection can see the archive files too (view 'attendance_all')
+        conn = open_all_attendance()
         c = conn.cursor()
 
-        c.execute("SELECT * FROM attendance")
-        rows = c.fetchall()
+        c.execute("SELECT * FROM attendance_all ORDER BY id")
+        first_row = c.fetchone()
 
-        if not rows:
+        if not first_row:
             messagebox.showinfo("Export", "No attendance records found to export.")
             return
 
@@ -98,7 +104,8 @@ def gui_export_csv():
         with open(ATTENDANCE_CSV_PATH, "w", newline="") as f:
             writer = csv.writer(f)
             writer.writerow(headers)  # Write the header row
-            writer.writerows(rows)  # Write all data rows
+            writer.writerow(first_row)
+            writer.writerows(c)  # Write the remaining rows straight from the cursor
 
         messagebox.showinfo(
             "Export Complete", f"Attendance data saved to {ATTENDANCE_CSV_PATH}"
@@ -122,7 +129,7 @@ def gui_export_csv():
 def main_gui():
     root = tk.Tk()
     root.title("Smart Attendance System")
-    root.geometry("400x350")
+    root.geometry("400x420")
 
     # Set padding for the main frame
     main_frame = tk.Frame(root, padx=20, pady=20)
@@ -183,6 +190,16 @@ def main_gui():
     )
     btn_export.pack(pady=(20, 0))  # Extra padding on top
 
+    # 5. Live "Who's In" view (updates while the recognizer is running)
+    btn_live = tk.Button(
+        main_frame,
+        text="Who's In (Live)",
+        command=lambda: LiveAttendanceWindow(root),
+        font=btn_font,
+        width=btn_width,
+    )
+    btn_live.pack(pady=(10, 0))
+
     # Start the GUI event loop
     root.mainloop()
 
@@ -0,0 +1,245 @@
+# This module adds a live "who's in" window to the Tkinter GUI.
+#
+# A background thread polls the database for NEW attendance rows only
+# (id greater than the last one it saw), using a read-only connection so it
+# never blocks the recognizer writing to the database. It keeps a small
+# per-student summary and hands the changes to the GUI through a queue.
+# The list only ever creates as many Tk rows as fit on screen, so it stays
+# responsive even with a million rows in the attendance log.
+
+import queue
+import sqlite3
+import threading
+import tkinter as tk
+from datetime import datetime
+from config.config import DB_PATH, LIVE_VIEW_POLL_SECONDS
+
+
+class AttendancePoller(threading.Thread):
+    """
+    Background thread that reads new attendance rows and sends per-student
+    updates to 'updates' as lists of (student_id, name, count, first, last).
+    Only rows with a timestamp >= 'since' are counted (today, by default).
+    Without a fixed 'since' the count starts again at midnight: the summary is
+    cleared and NEW_DAY is put on the queue so the window clears its list too.
+    """
+
+    NEW_DAY = None
+
+    def __init__(self, db_path=DB_PATH, since=None, interval=LIVE_VIEW_POLL_SECONDS):
+        super().__init__(daemon=True)
+        self.db_path = db_path
+        self.follow_today = since is None
+        self.since = since or start_of_day(datetime.now())
+        self.interval = interval
+        self.batch_size = 5000
+        self.last_id = 0
+        self.summary = {}  # student_id -> [name, count, first_seen, last_seen]
+        self.updates = queue.Queue()
+        self.stopped = threading.Event()
+
+    def stop(self):
+        self.stopped.set()
+
+    def connect(self):
+        # 'mode=ro' opens the file read-only; in WAL mode readers never block the writer
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def run(self):
+        try:
+            conn = self.connect()
+        except sqlite3.Error as e:
+            print(f"Live view could not open the database: {e}")
+            return
+
+        try:
+            self.skip_to_since(conn)
+            while not self.stopped.is_set():
+                rows = self.poll(conn)
+                # A full batch means there may be more waiting; read it right away
+                if len(rows) < self.batch_size:
+                    self.stopped.wait(self.interval)
+
+        except sqlite3.Error as e:
+            print(f"Live view database error: {e}")
+
+        finally:
+            conn.close()
+
+    def skip_to_since(self, conn):
+        """
+        Skips straight to the first row of the period we care about,
+        so we don't read the whole history on start-up.
+        """
+        row = conn.execute(
+            "SELECT MIN(id) FROM attendance WHERE timestamp >= ?", (self.since,)
+        ).fetchone()
+        if row[0] is None:
+            row = conn.execute("SELECT MAX(id) FROM attendance").fetchone()
+            self.last_id = row[0] or 0
+        else:
+            self.last_id = row[0] - 1
+
+    def poll(self, conn, now=None):
+        """Reads the next batch of new rows and queues the students that changed."""
+        if self.follow_today:
+            today = start_of_day(now or datetime.now())
+            if today > self.since:
+                # A new day: yesterday's students aren't "in" any more
+                self.since = today
+                self.summary = {}
+                self.updates.put(self.NEW_DAY)
+
+        rows = conn.execute(
+            "SELECT id, student_id, name, timestamp FROM attendance "
+            "WHERE id > ? ORDER BY id LIMIT ?",
+            (self.last_id, self.batch_size),
+        ).fetchall()
+        if not rows:
+            return rows
+
+        self.last_id = rows[-1][0]
+        changed = {}
+        for _, student_id, name, timestamp in rows:
+            if timestamp < self.since:
+                continue
+            entry = self.summary.get(student_id)
+            if entry is None:
+                entry = self.summary[student_id] = [name, 0, timestamp, timestamp]
+            entry[1] += 1
+            entry[3] = max(entry[3], timestamp)
+            changed[student_id] = (student_id, entry[0], entry[1], entry[2], entry[3])
+
+        if changed:
+            # Sent in the order they were last seen, oldest first
+            self.updates.put(sorted(changed.values(), key=lambda item: item[4]))
+        return rows
+
+
+def start_of_day(moment):
+    """Midnight of the day 'moment' is in, as a timestamp string."""
+    return moment.strftime("%Y-%m-%d 00:00:00")
+
+
+class VirtualList(tk.Frame):
+    """
+    A scrollable list that only has as many Listbox lines as are visible.
+    Scrolling just changes which slice of 'items' is shown.
+    """
+
+    def __init__(self, parent, visible_rows=20, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.items = []
+        self.offset = 0
+        self.visible_rows = visible_rows
+
+        self.listbox = tk.Listbox(
+            self, height=visible_rows, font=("Courier", 11), activestyle="none"
+        )
+        self.scrollbar = tk.Scrollbar(self, command=self.on_scroll)
+        self.listbox.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.listbox.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.listbox.bind("<Button-4>", lambda e: self.scroll_to(self.offset - 3))
+        self.listbox.bind("<Button-5>", lambda e: self.scroll_to(self.offset + 3))
+
+    def set_items(self, items):
+        self.items = items
+        self.scroll_to(self.offset)
+
+    def scroll_to(self, offset):
+        max_offset = max(0, len(self.items) - self.visible_rows)
+        self.offset = min(max(0, offset), max_offset)
+
+        # Replace the visible lines only
+        self.listbox.delete(0, tk.END)
+        for line in self.items[self.offset : self.offset + self.visible_rows]:
+            self.listbox.insert(tk.END, line)
+
+        if self.items:
+            first = self.offset / len(self.items)
+            last = min(1.0, (self.offset + self.visible_rows) / len(self.items))
+        else:
+            first, last = 0.0, 1.0
+        self.scrollbar.set(first, last)
+
+    def on_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.items)))
+        elif action == "scroll":
+            step = self.visible_rows if unit == "pages" else 1
+            self.scroll_to(self.offset + int(amount) * step)
+
+    def on_mouse_wheel(self, event):
+        self.scroll_to(self.offset - int(event.delta / 120) * 3)
+
+
+class LiveAttendanceWindow:
+    """The "Who's In" window: newest arrivals at the top."""
+
+    def __init__(self, root):
+        self.window = tk.Toplevel(root)
+        self.window.title("Who's In (live)")
+        self.window.geometry("560x460")
+
+        self.status = tk.Label(self.window, text="Loading...", anchor="w")
+        self.status.pack(fill=tk.X, padx=10, pady=(10, 0))
+
+        header = f"{'ID':<12}{'Name':<22}{'Seen':>5}  {'Last seen':<19}"
+        tk.Label(
+            self.window, text=header, font=("Courier", 11, "bold"), anchor="w"
+        ).pack(fill=tk.X, padx=10)
+
+        self.list = VirtualList(self.window)
+        self.list.pack(expand=True, fill=tk.BOTH, padx=10, pady=(0, 10))
+
+        # student_id -> display line. A dict remembers insertion order, so by
+        # re-inserting a student on every update the newest ones are at the end.
+        self.lines = {}
+
+        self.poller = AttendancePoller()
+        self.poller.start()
+
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.after_id = self.window.after(200, self.check_updates)
+
+    def check_updates(self):
+        changed = False
+        try:
+            while True:
+                updates = self.poller.updates.get_nowait()
+                if updates is AttendancePoller.NEW_DAY:
+                    self.lines.clear()
+                    changed = True
+                    continue
+                for update in updates:
+                    student_id, name, count, _, last = update
+                    self.lines.pop(student_id, None)
+                    self.lines[student_id] = (
+                        f"{student_id:<12}{name[:21]:<22}{count:>5}  {last:<19}"
+                    )
+                    changed = True
+        except queue.Empty:
+            pass
+
+        if changed:
+            self.list.set_items(list(reversed(self.lines.values())))
+        if changed and self.lines:
+            self.status.config(
+                text=f"{len(self.lines)} students in since {self.poller.since[:10]}"
+                f"  (updated {datetime.now().strftime('%H:%M:%S')})"
+            )
+        elif not self.lines:
+            self.status.config(
+                text=f"No attendance since {self.poller.since[:10]} yet."
+            )
+
+        self.after_id = self.window.after(500, self.check_updates)
+
+    def close(self):
+        self.window.after_cancel(self.after_id)
+        self.poller.stop()
+        self.window.destroy()
@@ -0,0 +1,407 @@
+# This module handles comparing face encodings against the known gallery.
+# The "linear" and "sharded" backends are EXACT (same answer as
+# face_recognition.face_distance); they only differ in how the work is spread
+# over the CPU. The quantized backend trades a little accuracy for memory.
+
+import os
+import numpy as np
+from multiprocessing import get_context, shared_memory
+from config.config import (
+    MATCH_THRESHOLD,
+    MATCH_BACKEND,
+    MATCH_WORKERS,
+    MATCH_BLOCK_ROWS,
+    GALLERY_STORAGE,
+    RESCORE_CANDIDATES,
+)
+from src.quantize import quantize_encodings
+
+# --- Shared helpers ---
+
+
+def blocked_top_k(
+    gallery, gallery_sq_norms, queries, k, block_rows=MATCH_BLOCK_ROWS, scale=None
+):
+    """
+    Finds the k closest gallery rows for every query encoding.
+
+    Instead of building a (gallery - query) difference array for every query,
+    we use the identity |g - q|^2 = |g|^2 - 2*g.q + |q|^2, so the heavy work
+    becomes one matrix product per block of gallery rows.
+
+    The gallery may also be a float16 or int8 array from src/quantize.py.
+    Those are multiplied in float32, and for int8 the per-dimension 'scale'
+    is folded into the queries (g.q = codes.(scale*q)) so the gallery
+    never has to be de-quantized.
+
+    Returns two (num_queries, k) arrays: squared distances and row indices
+    (relative to the 'gallery' passed in), sorted from best to worst.
+    """
+
+    num_queries = queries.shape[0]
+    k = min(k, gallery.shape[0])
+
+    best_sq = np.full((num_queries, k), np.inf)
+    best_idx = np.full((num_queries, k), -1, dtype=np.int64)
+    query_sq_norms = np.einsum("ij,ij->i", queries, queries)
+
+    product_queries = queries
+    if gallery.dtype != np.float64:
+        product_queries = queries.astype(np.float32)
+        if scale is not None:
+            product_queries *= scale
+
+    for start in range(0, gallery.shape[0], block_rows):
+        end = min(start + block_rows, gallery.shape[0])
+
+        # (num_queries, block) squared distances for this block
+        block_sq = gallery[start:end] @ product_queries.T
+        block_sq *= -2.0
+        block_sq += gallery_sq_norms[start:end, None]
+        block_sq += query_sq_norms[None, :]
+        block_sq = block_sq.T
+
+        # Merge this block's candidates with the best ones found so far
+        block_idx = np.broadcast_to(np.arange(start, end), block_sq.shape)
+        merged_sq = np.concatenate([best_sq, block_sq], axis=1)
+        merged_idx = np.concatenate([best_idx, block_idx], axis=1)
+
+        keep = np.argpartition(merged_sq, k - 1, axis=1)[:, :k]
+        best_sq = np.take_along_axis(merged_sq, keep, axis=1)
+        best_idx = np.take_along_axis(merged_idx, keep, axis=1)
+
+    order = np.argsort(best_sq, axis=1)
+    best_sq = np.take_along_axis(best_sq, order, axis=1)
+    best_idx = np.take_along_axis(best_idx, order, axis=1)
+
+    # Rounding can make tiny squared distances slightly negative
+    np.maximum(best_sq, 0.0, out=best_sq)
+    return best_sq, best_idx
+
+
+def exact_rescore(gallery, queries, candidate_idx):
+    """
+    Recomputes the distances of the final candidates the same way
+    face_recognition.face_distance does (norm of the difference), so
+    the threshold decision is bit-for-bit the same as the original code.
+    """
+
+    distances = np.empty(candidate_idx.shape)
+    for i, query in enumerate(queries):
+        rows = gallery[candidate_idx[i]]
+        distances[i] = np.linalg.norm(rows - query, axis=1)
+
+    order = np.argsort(distances, axis=1)
+    distances = np.take_along_axis(distances, order, axis=1)
+    candidate_idx = np.take_along_axis(candidate_idx, order, axis=1)
+    return distances, candidate_idx
+
+
+# --- Backend 1: Linear (single process) ---
+
+
+class LinearMatcher:
+    """
+    Exact search in the current process.
+    This is what run_recognizer always did with face_recognition.face_distance.
+    """
+
+    def __init__(self, known_face_encodings):
+        self.gallery = np.asarray(known_face_encodings, dtype=np.float64).reshape(
+            -1, 128
+        )
+        self.gallery_sq_norms = np.einsum("ij,ij->i", self.gallery, self.gallery)
+
+    def __len__(self):
+        return self.gallery.shape[0]
+
+    def search(self, face_encodings, k=1):
+        """Returns (distances, indices), both shaped (num_faces, k), best first."""
+        queries = np.asarray(face_encodings, dtype=np.float64).reshape(-1, 128)
+        if len(self) == 0 or queries.shape[0] == 0:
+            return np.empty((queries.shape[0], 0)), np.empty(
+                (queries.shape[0], 0), dtype=np.int64
+            )
+
+        _, candidates = blocked_top_k(self.gallery, self.gallery_sq_norms, queries, k)
+        return exact_rescore(self.gallery, queries, candidates)
+
+    def close(self):
+        pass
+
+
+# --- Backend 2: Sharded across processes with shared memory ---
+
+# Each worker process fills these in once (in _attach_worker) so that
+# every search task can read the gallery without it being copied.
+_worker_shm = None
+_worker_gallery = None
+_worker_sq_norms = None
+
+
+def _open_shared_memory(name):
+    # Python 3.13+ lets us tell the resource tracker not to "clean up"
+    # (unlink) memory that belongs to the parent process.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+# numpy's BLAS library starts its own threads (one per core by default). With one
+# worker process per core, that would run N x N threads on N cores, so workers
+# are limited to one BLAS thread each. These variables are read when numpy is
+# first imported, which is why the workers are started with "spawn" (a fresh
+# interpreter) instead of "fork" (a copy of this one, BLAS already running).
+BLAS_THREAD_VARIABLES = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+
+def single_thread_pool(processes, initializer=None, initargs=()):
+    """Starts a process pool whose workers each use one BLAS thread."""
+    saved = {name: os.environ.get(name) for name in BLAS_THREAD_VARIABLES}
+    os.environ.update({name: "1" for name in BLAS_THREAD_VARIABLES})
+    try:
+        # The workers are started here and copy the environment as it is now
+        return get_context("spawn").Pool(
+            processes=processes, initializer=initializer, initargs=initargs
+        )
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def _attach_worker(shm_name, num_rows):
+    """Pool initializer: maps the parent's shared gallery into this worker."""
+    global _worker_shm, _worker_gallery, _worker_sq_norms
+
+    _worker_shm = _open_shared_memory(shm_name)
+
+    # The block holds the gallery (num_rows x 128) followed by its squared norms
+    _worker_gallery = np.ndarray(
+        (num_rows, 128), dtype=np.float64, buffer=_worker_shm.buf
+    )
+    _worker_sq_norms = np.ndarray(
+        (num_rows,),
+        dtype=np.float64,
+        buffer=_worker_shm.buf,
+        offset=num_rows * 128 * 8,
+    )
+
+
+def _search_shard(task):
+    """Runs in a worker: top-k search over rows [start, end) of the shared gallery."""
+    start, end, queries, k, block_rows = task
+    shard_sq, shard_idx = blocked_top_k(
+        _worker_gallery[start:end],
+        _worker_sq_norms[start:end],
+        queries,
+        k,
+        block_rows,
+    )
+    return shard_sq, shard_idx + start
+
+
+class SharedMemoryMatcher:
+    """
+    Exact search where the gallery lives in one shared memory block and is
+    split into one shard per worker process. Each worker finds its own top-k
+    and the parent merges them into the global top-k.
+    """
+
+    def __init__(
+        self, known_face_encodings, workers=MATCH_WORKERS, block_rows=MATCH_BLOCK_ROWS
+    ):
+        gallery = np.asarray(known_face_encodings, dtype=np.float64).reshape(-1, 128)
+        self.num_rows = gallery.shape[0]
+        self.workers = workers or os.cpu_count() or 1
+        self.block_rows = block_rows
+
+        # --- 1. Copy the gallery into shared memory (once) ---
+        nbytes = max(self.num_rows * 129 * 8, 1)
+        self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        self.gallery = np.ndarray(
+            (self.num_rows, 128), dtype=np.float64, buffer=self.shm.buf
+        )
+        self.gallery_sq_norms = np.ndarray(
+            (self.num_rows,),
+            dtype=np.float64,
+            buffer=self.shm.buf,
+            offset=self.num_rows * 128 * 8,
+        )
+        self.gallery[:] = gallery
+        np.einsum("ij,ij->i", self.gallery, self.gallery, out=self.gallery_sq_norms)
+        del gallery
+
+        # --- 2. Split the rows into one contiguous shard per worker ---
+        bounds = np.linspace(0, self.num_rows, self.workers + 1).astype(int)
+        self.shards = [
+            (bounds[i], bounds[i + 1])
+            for i in range(self.workers)
+            if bounds[i + 1] > bounds[i]
+        ]
+
+        # --- 3. Start the workers; they attach to the shared block by name ---
+        self.pool = single_thread_pool(
+            self.workers, _attach_worker, (self.shm.name, self.num_rows)
+        )
+
+    def __len__(self):
+        return self.num_rows
+
+    def search(self, face_encodings, k=1):
+        """Returns (distances, indices), both shaped (num_faces, k), best first."""
+        queries = np.asarray(face_encodings, dtype=np.float64).reshape(-1, 128)
+        if self.num_rows == 0 or queries.shape[0] == 0:
+            return np.empty((queries.shape[0], 0)), np.empty(
+                (queries.shape[0], 0), dtype=np.int64
+            )
+
+        tasks = [
+            (start, end, queries, k, self.block_rows) for start, end in self.shards
+        ]
+        results = self.pool.map(_search_shard, tasks)
+
+        # Merge every shard's top-k into the global top-k
+        all_sq = np.concatenate([r[0] for r in results], axis=1)
+        all_idx = np.concatenate([r[1] for r in results], axis=1)
+        k = min(k, all_sq.shape[1])
+        keep = np.argpartition(all_sq, k - 1, axis=1)[:, :k]
+        candidates = np.take_along_axis(all_idx, keep, axis=1)
+
+        return exact_rescore(self.gallery, queries, candidates)
+
+    def close(self):
+        """Stops the workers and frees the shared memory block."""
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+        if self.shm is not None:
+            # Drop our numpy views first, otherwise the buffer can't be closed
+            self.gallery = None
+            self.gallery_sq_norms = None
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+
+# --- Backend 3: Quantized (float16 / int8) gallery ---
+
+
+class QuantizedMatcher:
+    """
+    Search over a compact float16 or int8 copy of the gallery.
+
+    The compact copy is only used to pick the best few candidates; those are
+    then re-scored against 'rescore_source' (the full-precision gallery,
+    usually a memory-mapped .npy file), so their distances are exact.
+    The decision can still differ from the float64 search when the true best
+    match is not among the candidates (bench_quantized counts how often).
+    Without a rescore source the approximate distances are returned.
+    """
+
+    def __init__(
+        self,
+        known_face_encodings,
+        storage=GALLERY_STORAGE,
+        rescore_source=None,
+        rescore_candidates=RESCORE_CANDIDATES,
+        block_rows=MATCH_BLOCK_ROWS,
+    ):
+        self.quantized = quantize_encodings(known_face_encodings, storage)
+        self.rescore_source = rescore_source
+        self.rescore_candidates = rescore_candidates
+        self.block_rows = block_rows
+
+    def __len__(self):
+        return self.quantized["codes"].shape[0]
+
+    def search(self, face_encodings, k=1):
+        """Returns (distances, indices), both shaped (num_faces, k), best first."""
+        queries = np.asarray(face_encodings, dtype=np.float64).reshape(-1, 128)
+        if len(self) == 0 or queries.shape[0] == 0:
+            return np.empty((queries.shape[0], 0)), np.empty(
+                (queries.shape[0], 0), dtype=np.int64
+            )
+
+        num_candidates = k
+        if self.rescore_source is not None:
+            num_candidates = max(k, self.rescore_candidates)
+
+        approx_sq, candidates = blocked_top_k(
+            self.quantized["codes"],
+            self.quantized["sq_norms"],
+            queries,
+            num_candidates,
+            self.block_rows,
+            self.quantized["scale"],
+        )
+
+        if self.rescore_source is None:
+            return np.sqrt(approx_sq)[:, :k], candidates[:, :k]
+
+        distances, candidates = exact_rescore(self.rescore_source, queries, candidates)
+        return distances[:, :k], candidates[:, :k]
+
+    def close(self):
+        pass
+
+
+# --- Public helpers used by the recognizer ---
+
+
+def create_matcher(
+    known_face_encodings,
+    backend=MATCH_BACKEND,
+    workers=MATCH_WORKERS,
+    storage=GALLERY_STORAGE,
+    rescore_source=None,
+):
+    """
+    Builds the search backend selected in config.py (or passed in).
+    A compact 'storage' (float16/int8) always uses the QuantizedMatcher,
+    which runs in this process: it can't be combined with "sharded".
+    """
+    if storage != "float64":
+        if backend == "sharded":
+            print(
+                f"Warning: GALLERY_STORAGE = '{storage}' can't be combined with "
+                "MATCH_BACKEND = 'sharded'. Using a single-process quantized search."
+            )
+        return QuantizedMatcher(
+            known_face_encodings, storage=storage, rescore_source=rescore_source
+        )
+    if backend == "linear":
+        return LinearMatcher(known_face_encodings)
+    if backend == "sharded":
+        return SharedMemoryMatcher(known_face_encodings, workers=workers)
+    raise ValueError(f"Unknown match backend: {backend}")
+
+
+def find_best_matches(matcher, face_encodings, threshold=MATCH_THRESHOLD):
+    """
+    For each face encoding, returns the gallery index of the best match,
+    or None if the closest known face is further away than 'threshold'.
+    This is the same decision compare_faces + face_distance + argmin made.
+    """
+
+    if len(face_encodings) == 0:
+        return []
+
+    distances, indices = matcher.search(face_encodings, k=1)
+    if distances.shape[1] == 0:
+        return [None] * len(face_encodings)
+
+    return [
+        int(indices[i, 0]) if distances[i, 0] <= threshold else None
+        for i in range(len(face_encodings))
+    ]
@@ -0,0 +1,230 @@
+# This module keeps the 'attendance' table small.
+# Old rows are moved out of students.db into one archive file
+# (data/archive/attendance_archive.db), one table per month
+# (attendance_2025_09, attendance_2025_10, ...). The 'attendance' table in
+# students.db (the "hot" table) only keeps the current period, so the lookups
+# mark_attendance does on every recognised face stay fast.
+#
+# Code that needs the *whole* history (like the CSV export) uses
+# open_all_attendance(), which attaches the archive and gives one view over everything.
+#
+# All months share ONE archive file on purpose: SQLite can only attach about
+# 10 databases to a connection, so a file per year would stop working after
+# 10 years of history.
+
+import os
+import sqlite3
+from datetime import datetime
+from config.config import DB_PATH, ARCHIVE_DIR, ARCHIVE_PATH, ARCHIVE_KEEP_MONTHS
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Same columns as the hot table. We keep the original 'id' so rows can be
+# followed from the hot table into the archive.
+PARTITION_COLUMNS = "id, student_id, name, timestamp"
+
+
+def partition_name(month):
+    """'2025-09' -> 'attendance_2025_09'"""
+    return "attendance_" + month.replace("-", "_")
+
+
+def month_start(year, month):
+    """Returns the first moment of a month as a timestamp string."""
+    # Let months below 1 roll back into the previous year(s)
+    while month < 1:
+        month += 12
+        year -= 1
+    return f"{year:04d}-{month:02d}-01 00:00:00"
+
+
+def next_month(month):
+    """'2025-12' -> '2026-01-01 00:00:00'"""
+    year, number = int(month[:4]), int(month[5:7])
+    if number == 12:
+        return month_start(year + 1, 1)
+    return month_start(year, number + 1)
+
+
+def list_partitions(conn, schema="main"):
+    """Names of the monthly partition tables in 'schema', oldest first."""
+    tables = conn.execute(
+        f"SELECT name FROM {schema}.sqlite_master "
+        "WHERE type = 'table' AND name LIKE 'attendance_%' ORDER BY name"
+    ).fetchall()
+    return [table for (table,) in tables]
+
+
+def attach_archive(conn, archive_path=ARCHIVE_PATH):
+    """
+    Attaches the archive file to 'conn' as 'archive' (if it exists) and
+    returns its partition tables, oldest first.
+    """
+    if not archive_path.exists():
+        return []
+    conn.execute("ATTACH DATABASE ? AS archive", (str(archive_path),))
+    return list_partitions(conn, "archive")
+
+
+# --- Reading across partitions ---
+
+
+def open_all_attendance(db_path=DB_PATH, archive_path=ARCHIVE_PATH):
+    """
+    Opens students.db with the archive attached and creates a temporary view
+    'attendance_all' that contains every attendance row (archived and current).
+    Queries and exports that need the full history should read from it.
+    """
+    conn = sqlite3.connect(str(db_path))
+    partitions = attach_archive(conn, archive_path)
+
+    selects = [f"SELECT {PARTITION_COLUMNS} FROM main.attendance"]
+    for table in partitions:
+        selects.append(f"SELECT {PARTITION_COLUMNS} FROM archive.{table}")
+
+    conn.execute("CREATE TEMP VIEW attendance_all AS " + " UNION ALL ".join(selects))
+    return conn
+
+
+def last_attendance_time(c, student_id, check_archives=True):
+    """
+    Returns the newest timestamp string for a student, or None.
+
+    The hot table is checked first (uses the (student_id, timestamp) index).
+    Only if the student has no row there do we look in the newest archive
+    partition, in case a cooldown runs across the moment the archive was made.
+    'check_archives=False' only checks the table behind 'c' (for scratch databases).
+    """
+    c.execute(
+        "SELECT timestamp FROM attendance WHERE student_id = ? ORDER BY timestamp DESC LIMIT 1",
+        (student_id,),
+    )
+    row = c.fetchone()
+    if row:
+        return row[0]
+
+    if not check_archives:
+        return None
+    if not ARCHIVE_PATH.exists():
+        return None
+
+    archive = sqlite3.connect(str(ARCHIVE_PATH))
+    try:
+        tables = list_partitions(archive)
+        if not tables:
+            return None
+        row = archive.execute(
+            f"SELECT timestamp FROM {tables[-1]} WHERE student_id = ? "
+            "ORDER BY timestamp DESC LIMIT 1",
+            (student_id,),
+        ).fetchone()
+        return row[0] if row else None
+    finally:
+        archive.close()
+
+
+# --- The 'archive' command ---
+
+
+def archive_attendance(keep_months=ARCHIVE_KEEP_MONTHS, now=None):
+    """
+    Moves every attendance row older than the last 'keep_months' months
+    (counting the current month) from students.db into the monthly archive tables.
+    Rows are copied and deleted in one transaction, so a crash can't lose them.
+    """
+
+    now = now or datetime.now()
+    cutoff = month_start(now.year, now.month - keep_months + 1)
+    print(f"Archiving attendance older than {cutoff}...")
+
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+
+    conn = None
+    try:
+        conn = sqlite3.connect(str(DB_PATH))
+        c = conn.cursor()
+
+        c.execute(
+            "SELECT DISTINCT substr(timestamp, 1, 7) FROM attendance WHERE timestamp < ?",
+            (cutoff,),
+        )
+        months = [row[0] for row in c.fetchall()]
+        if not months:
+            print("Nothing to archive.")
+            return
+
+        # ATTACH is not allowed inside a transaction, so attach the archive first
+        c.execute("ATTACH DATABASE ? AS archive", (str(ARCHIVE_PATH),))
+
+        total = 0
+        c.execute("BEGIN")
+        for month in months:
+            table = partition_name(month)
+            start, end = month + "-01 00:00:00", next_month(month)
+
+            c.execute(f"""CREATE TABLE IF NOT EXISTS archive.{table} (
+                    id INTEGER PRIMARY KEY,
+                    student_id TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    timestamp TEXT NOT NULL
+                )""")
+            c.execute(
+                f"CREATE INDEX IF NOT EXISTS archive.idx_{table}_student_time "
+                f"ON {table} (student_id, timestamp)"
+            )
+
+            # 'OR IGNORE' makes it safe to re-run after an interrupted archive
+            c.execute(
+                f"INSERT OR IGNORE INTO archive.{table} ({PARTITION_COLUMNS}) "
+                f"SELECT {PARTITION_COLUMNS} FROM main.attendance "
+                "WHERE timestamp >= ? AND timestamp < ?",
+                (start, end),
+            )
+            c.execute(
+                "DELETE FROM main.attendance WHERE timestamp >= ? AND timestamp < ?",
+                (start, end),
+            )
+            print(f"  {month}: moved {c.rowcount} rows to archive.{table}")
+            total += c.rowcount
+
+        conn.commit()
+        print(f"Archived {total} rows. Run 'compact' to shrink students.db.")
+
+    except sqlite3.Error as e:
+        print(f"Database error while archiving: {e}")
+        if conn:
+            conn.rollback()
+
+    finally:
+        if conn:
+            conn.close()
+
+
+# --- The 'compact' command ---
+
+
+def compact_databases():
+    """
+    Runs VACUUM on students.db and the archive file.
+    VACUUM rebuilds the file so the space freed by archived rows is given back.
+    """
+
+    for path in (DB_PATH, ARCHIVE_PATH):
+        if not path.exists():
+            continue
+
+        size_before = path.stat().st_size
+        conn = None
+        try:
+            conn = sqlite3.connect(str(path))
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA optimize")
+        except sqlite3.Error as e:
+            print(f"Database error while compacting {path}: {e}")
+            continue
+        finally:
+            if conn:
+                conn.close()
+
+        size_after = path.stat().st_size
+        print(f"{path.name}: {size_before / 1024:.0f} KB -> {size_after / 1024:.0f} KB")
@@ -0,0 +1,209 @@
+# This module makes the gallery smaller by replacing each student's samples
+# with a few "prototypes".
+#
+# 'encode' keeps every photo as its own gallery row (10 photos x N students),
+# and 'run' compares every face with all of them. Most of a student's photos
+# look almost the same, so for each student we keep:
+#   - the mean of their samples (one row that is close to all the usual photos)
+#   - a few real samples (medoids) for the photos the mean doesn't cover,
+#     e.g. with glasses, or in different light
+# Near-duplicate samples (burst shots) are dropped before this.
+#
+# Each prototype remembers which source images it stands for, so you can
+# always see where a gallery row came from.
+#
+# prototypes.pkl also remembers which encodings.pkl it was made from, so 'run'
+# can warn when 'encode' or 'enroll_bulk' has changed the gallery since
+# (students added after 'compact_gallery' can't be recognised with --prototypes).
+
+import pickle
+import numpy as np
+from config.config import (
+    ENCODINGS_PATH,
+    PROTOTYPES_PATH,
+    PROTOTYPE_DUPLICATE_DISTANCE,
+    PROTOTYPE_COVER_DISTANCE,
+    PROTOTYPE_MAX_PER_STUDENT,
+)
+
+
+def pairwise_distances(samples):
+    """Euclidean distance between every pair of rows in 'samples'."""
+    sq_norms = np.einsum("ij,ij->i", samples, samples)
+    squared = sq_norms[:, None] + sq_norms[None, :] - 2.0 * (samples @ samples.T)
+    return np.sqrt(np.maximum(squared, 0.0))
+
+
+def student_prototypes(
+    samples,
+    duplicate_distance=PROTOTYPE_DUPLICATE_DISTANCE,
+    cover_distance=PROTOTYPE_COVER_DISTANCE,
+    max_prototypes=PROTOTYPE_MAX_PER_STUDENT,
+):
+    """
+    Reduces one student's samples (n x 128) to a few prototypes.
+
+    Returns (prototypes, assignment, kinds, duplicates, uncovered):
+      prototypes - (m x 128) array; row 0 is the mean, the others are medoids
+      assignment - for each sample, the prototype row it is closest to
+      kinds      - "mean" or "medoid" for each prototype
+      duplicates - how many samples were dropped as near-duplicates
+      uncovered  - samples still further than 'cover_distance' from every prototype
+    """
+    samples = np.asarray(samples, dtype=np.float64).reshape(-1, 128)
+    distances = pairwise_distances(samples)
+
+    # --- 1. Drop near-duplicates (keep the first of each group) ---
+    kept = []
+    for i in range(len(samples)):
+        if all(distances[i, j] > duplicate_distance for j in kept):
+            kept.append(i)
+    kept = np.array(kept)
+    kept_distances = distances[np.ix_(kept, kept)]
+
+    # --- 2. Start with the mean ---
+    mean = samples[kept].mean(axis=0)
+    prototypes = [mean]
+    kinds = ["mean"]
+    nearest = np.linalg.norm(samples[kept] - mean, axis=1)
+
+    # --- 3. Add medoids until every sample is covered ---
+    # The medoid of the uncovered samples is the one closest to all the others,
+    # so one medoid covers a whole group of similar "unusual" photos.
+    while len(prototypes) < max_prototypes:
+        uncovered = np.flatnonzero(nearest > cover_distance)
+        if len(uncovered) == 0:
+            break
+        group = kept_distances[np.ix_(uncovered, uncovered)]
+        pick = uncovered[np.argmin(group.sum(axis=1))]
+
+        prototypes.append(samples[kept[pick]])
+        kinds.append("medoid")
+        nearest = np.minimum(nearest, kept_distances[pick])
+
+    prototypes = np.array(prototypes)
+
+    # Every sample (duplicates too) is mapped to the prototype it is closest to
+    to_prototypes = np.linalg.norm(samples[:, None, :] - prototypes[None], axis=2)
+    assignment = np.argmin(to_prototypes, axis=1)
+    uncovered = int(np.count_nonzero(to_prototypes.min(axis=1) > cover_distance))
+
+    return prototypes, assignment, kinds, len(samples) - len(kept), uncovered
+
+
+def build_prototype_gallery(data, **options):
+    """
+    Builds the prototype gallery from an encodings dictionary (as saved by
+    'encode'). Returns a dictionary with the same "encodings", "ids" and
+    "names" lists (so the recognizer can load it the same way), plus:
+      "kinds"   - "mean" or "medoid" for each row
+      "sources" - for each row, the source images it stands for
+      "stats"   - counts for the summary
+    """
+    encodings = np.asarray(data["encodings"], dtype=np.float64).reshape(-1, 128)
+    ids = data["ids"]
+    # Pickles made before 'paths' was saved have no source images
+    paths = data.get("paths") or [None] * len(ids)
+
+    # Rows of each student, in the order the students first appear
+    rows_by_student = {}
+    for row, student_id in enumerate(ids):
+        rows_by_student.setdefault(student_id, []).append(row)
+
+    gallery = {"encodings": [], "ids": [], "names": [], "kinds": [], "sources": []}
+    duplicates = uncovered = 0
+
+    for student_id, rows in rows_by_student.items():
+        prototypes, assignment, kinds, dropped, missed = student_prototypes(
+            encodings[rows], **options
+        )
+        duplicates += dropped
+        uncovered += missed
+
+        for p, prototype in enumerate(prototypes):
+            members = [paths[rows[i]] for i in np.flatnonzero(assignment == p)]
+            gallery["encodings"].append(prototype)
+            gallery["ids"].append(student_id)
+            gallery["names"].append(data["names"][rows[0]])
+            gallery["kinds"].append(kinds[p])
+            gallery["sources"].append(members)
+
+    gallery["stats"] = {
+        "samples": len(encodings),
+        "prototypes": len(gallery["encodings"]),
+        "students": len(rows_by_student),
+        "duplicates": duplicates,
+        "uncovered": uncovered,
+    }
+    return gallery
+
+
+def stale_prototypes_warning(gallery, encodings_path=ENCODINGS_PATH):
+    """
+    Returns a warning if 'gallery' (a loaded prototypes.pkl) was made from an
+    older encodings.pkl than the one at 'encodings_path', or None if it's current.
+    """
+    source = gallery.get("source")
+    if source is None:
+        return (
+            "prototypes.pkl doesn't say which encodings.pkl it was made from. "
+            "Re-run 'compact_gallery' to be sure it is up to date."
+        )
+    try:
+        mtime_ns = encodings_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if mtime_ns != source["mtime_ns"]:
+        return (
+            f"{encodings_path.name} has changed since 'compact_gallery' was run "
+            f"(it had {source['samples']} samples then). Students added since "
+            "can't be recognised with --prototypes. Re-run 'compact_gallery'."
+        )
+    return None
+
+
+# --- The 'compact_gallery' command ---
+
+
+def run_compact_gallery():
+    """Reads encodings.pkl and saves the prototype gallery to prototypes.pkl."""
+    try:
+        # Read before loading, so a change while we work still counts as a change
+        mtime_ns = ENCODINGS_PATH.stat().st_mtime_ns
+        with open(ENCODINGS_PATH, "rb") as f:
+            data = pickle.load(f)
+    except FileNotFoundError:
+        print(f"Error: Encodings file not found at {ENCODINGS_PATH}.")
+        print("Please run 'python src/cli.py encode' first.")
+        return
+
+    if len(data["encodings"]) == 0:
+        print("The gallery is empty. Nothing to compact.")
+        return
+    if "paths" not in data:
+        print(
+            "Note: this encodings.pkl has no image paths. Re-run 'encode' to keep them."
+        )
+
+    gallery = build_prototype_gallery(data)
+    stats = gallery["stats"]
+    # Which encodings.pkl this was made from (see stale_prototypes_warning)
+    gallery["source"] = {"samples": stats["samples"], "mtime_ns": mtime_ns}
+
+    with open(PROTOTYPES_PATH, "wb") as f:
+        pickle.dump(gallery, f)
+
+    print(
+        f"{stats['samples']} samples of {stats['students']} students -> "
+        f"{stats['prototypes']} prototypes "
+        f"({stats['samples'] / stats['prototypes']:.1f}x smaller)"
+    )
+    print(f"Near-duplicates dropped: {stats['duplicates']}")
+    if stats["uncovered"]:
+        print(
+            f"WARNING: {stats['uncovered']} samples are further than "
+            f"{PROTOTYPE_COVER_DISTANCE} from every prototype of their student "
+            "(raise PROTOTYPE_MAX_PER_STUDENT to cover them)."
+        )
+    print(f"Prototype gallery saved to {PROTOTYPES_PATH}")
+    print("Use 'run --prototypes' (or MATCH_PROTOTYPES = True) to match against it.")
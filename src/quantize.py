@@ -0,0 +1,72 @@
+# This module shrinks the gallery of face encodings so it uses less memory.
+# face_recognition gives us float64 encodings (128 x 8 bytes = 1 KB each);
+# here we store them as float16 (256 bytes) or int8 (128 bytes) instead.
+
+import numpy as np
+
+STORAGE_MODES = ("float64", "float16", "int8")
+
+
+def quantize_encodings(known_face_encodings, mode):
+    """
+    Converts a list/array of 128-d encodings into a compact gallery.
+
+    Returns a dictionary with:
+      'mode'     - "float64", "float16" or "int8"
+      'codes'    - the stored (num_rows, 128) array
+      'scale'    - per-dimension scale for int8 (value = code * scale), else None
+      'sq_norms' - float32 squared length of every (de-quantized) row,
+                   used by the distance kernel
+    """
+
+    if mode not in STORAGE_MODES:
+        raise ValueError(f"Unknown gallery storage: {mode}")
+
+    gallery = np.asarray(known_face_encodings, dtype=np.float64).reshape(-1, 128)
+    scale = None
+
+    if mode == "float64":
+        codes = gallery
+    elif mode == "float16":
+        codes = gallery.astype(np.float16)
+    else:
+        # Symmetric int8: each dimension gets its own scale so the largest
+        # value in that dimension maps to +/-127.
+        max_abs = np.abs(gallery).max(axis=0) if len(gallery) else np.ones(128)
+        scale = (np.where(max_abs > 0, max_abs, 1.0) / 127.0).astype(np.float32)
+        codes = np.clip(np.rint(gallery / scale), -127, 127).astype(np.int8)
+
+    return {
+        "mode": mode,
+        "codes": codes,
+        "scale": scale,
+        "sq_norms": row_sq_norms(codes, scale),
+    }
+
+
+def dequantize(codes, scale=None):
+    """Turns stored rows back into float32 encodings (approximately)."""
+    rows = codes.astype(np.float32)
+    if scale is not None:
+        rows *= scale
+    return rows
+
+
+def row_sq_norms(codes, scale=None, block_rows=65536):
+    """Squared length of every de-quantized row, computed one block at a time."""
+    if codes.dtype == np.float64:
+        return np.einsum("ij,ij->i", codes, codes)
+
+    sq_norms = np.empty(codes.shape[0], dtype=np.float32)
+    for start in range(0, codes.shape[0], block_rows):
+        rows = dequantize(codes[start : start + block_rows], scale)
+        sq_norms[start : start + block_rows] = np.einsum("ij,ij->i", rows, rows)
+    return sq_norms
+
+
+def gallery_nbytes(quantized):
+    """How many bytes the compact gallery takes in memory."""
+    total = quantized["codes"].nbytes + quantized["sq_norms"].nbytes
+    if quantized["scale"] is not None:
+        total += quantized["scale"].nbytes
+    return total
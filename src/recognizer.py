@@ -1,193 +1,437 @@
 # This is your task, Coder 1. This is the Core Engine.
-# This script loads the encodings, opens the webcam,
+# This script loads the encodings, opens the webcam (or another frame source),
 # and performs real-time face recognition.
 
 import cv2
-import face_recognition
+import os
 import pickle
+import time
 import numpy as np  # NumPy is used for numerical operations
-from config.config import ENCODINGS_PATH
-from src.attendance import mark_attendance  # Import our attendance function
-
+from datetime import datetime
+from config.config import (
+    DB_PATH,
+    ENCODINGS_PATH,
+    ENCODINGS_ARRAY_PATH,
+    PROTOTYPES_PATH,
+    MATCH_PROTOTYPES,
+    GALLERY_STORAGE,
+    FRAME_SOURCE,
+    DETECTOR_RUN,
+    FRAME_BUDGET_MS,
+    REVERIFY_FRAMES,
+)
+from src.attendence import mark_attendance  # Import our attendance function
+from src.matcher import create_matcher, find_best_matches
+from src.frame_sources import open_frame_source, SessionRecorder
+from src.frame_processing import FrameProcessor
+from src.detectors import create_detector
+from src.sessions import load_session, SessionMatcher
+from src.tracking import FaceTracker
+from src.scheduler import FaceScheduler
+from src.db import create_scratch_attendance_db
+from src.prototypes import stale_prototypes_warning
+
+# Where 'run' writes attendance (see run_recognizer's 'attendance' argument)
+ATTENDANCE_MODES = ("db", "scratch", "off")
+
+
+def load_rescore_source(known_face_encodings):
+    """
+    Returns the full-precision gallery used for re-scoring: the memory-mapped
+    encodings.npy if it matches the pickle, otherwise an in-memory array.
+    """
+    if ENCODINGS_ARRAY_PATH.exists():
+        array = np.load(ENCODINGS_ARRAY_PATH, mmap_mode="r")
+        if array.shape == (len(known_face_encodings), 128):
+            return array
+        print(f"Warning: {ENCODINGS_ARRAY_PATH} is out of date. Re-run 'encode'.")
+
+    return np.asarray(known_face_encodings, dtype=np.float64).reshape(-1, 128)
+
+
+def process_tracked_frame(
+    processor,
+    rgb,
+    tracker,
+    scheduler,
+    matcher,
+    known_student_ids,
+    known_names,
+    frame_time,
+    session_matcher=None,
+    attendance_db=DB_PATH,
+):
+    """
+    Detect -> track -> encode -> match, where the FaceScheduler decides which
+    faces to encode (and defers the rest if the FRAME_BUDGET_MS runs out).
+    In session mode, faces whose track belongs to a student already marked in
+    this session are not encoded or matched again. Otherwise a recognised face
+    is only encoded again every REVERIFY_FRAMES frames, to check it's still them.
+    Attendance is written to 'attendance_db' (None = not written).
+    Returns (face_locations, face_names) for drawing.
+    """
 
-def run_recognizer():
+    face_locations = processor.detector.detect(rgb)
+    tracks = tracker.update(face_locations)
+
+    if session_matcher:
+        marked = session_matcher.marked
+        session_matcher.encodes_skipped += sum(
+            1 for track in tracks if track.student_id in marked
+        )
+        results = scheduler.process(
+            tracks,
+            rgb,
+            frame_time,
+            tracker.frame_number,
+            match=session_matcher.match,
+            skip=lambda track: track.student_id in marked,
+        )
+    else:
+        frame_number = tracker.frame_number
+        results = scheduler.process(
+            tracks,
+            rgb,
+            frame_time,
+            frame_number,
+            match=lambda encodings: find_best_matches(matcher, encodings),
+            skip=lambda track: track.student_id is not None
+            and frame_number - track.matched_at < REVERIFY_FRAMES,
+        )
+
+    for track, best_match_index, seen_at in results:
+        track.matched_at = tracker.frame_number
+        if best_match_index is None:
+            track.student_id = None
+            track.name = "Unknown"
+            continue
+
+        track.student_id = known_student_ids[best_match_index]
+        track.name = known_names[best_match_index]
+
+        # 'seen_at' is when the face was seen, which may be an earlier frame
+        # if the scheduler had to put it off
+        if attendance_db:
+            mark_attendance(track.student_id, track.name, seen_at, attendance_db)
+        if session_matcher:
+            session_matcher.marked.add(track.student_id)
+
+    return face_locations, [track.name for track in tracks]
+
+
+def run_recognizer(
+    source=FRAME_SOURCE,
+    record_dir=None,
+    realtime=False,
+    display=True,
+    detector=DETECTOR_RUN,
+    session=None,
+    budget_ms=FRAME_BUDGET_MS,
+    prototypes=MATCH_PROTOTYPES,
+    attendance=None,
+    keep_scratch=False,
+):
     """
     This is the main function for the face recognition engine.
     It loads known faces and compares them to faces found in the webcam feed.
+
+    source     - where frames come from, e.g. "webcam:0" or "replay:sessions/monday"
+                 (see src/frame_sources.py)
+    record_dir - if set, every frame read is saved there so it can be replayed later
+    realtime   - replay at the recorded speed instead of as fast as possible
+    display    - set to False to run without a window (for profiling and tests)
+    detector   - face detector to use: "hog", "haar" or "dnn" (see src/detectors.py)
+    session    - a session ID (see 'add_session'): match against that class's roster
+                 first, and stop re-encoding students already marked in it
+    budget_ms  - time limit (ms) for encoding faces on one frame; faces that don't
+                 fit are encoded on the next frames (see src/scheduler.py)
+    prototypes - match against the compacted gallery made by 'compact_gallery'
+                 (a few prototypes per student, see src/prototypes.py)
+    attendance - where attendance is written: "db" (students.db), "scratch" (a new
+                 temporary database) or "off". None = "db" for a webcam and
+                 "scratch" for every other source, whose frame times are made up
+    keep_scratch - keep the scratch database when 'run' ends (it is deleted by default)
     """
 
+    # Build the detector first: a missing model file should stop us before we
+    # start the matcher's workers or open the camera
+    try:
+        face_detector = create_detector(detector)
+    except (RuntimeError, ValueError) as e:
+        print(f"Error: {e}")
+        return
+
     # --- 1. Load Known Faces and Encodings ---
-    print("Loading known face encodings...")
+    gallery_path = PROTOTYPES_PATH if prototypes else ENCODINGS_PATH
+    print(f"Loading known face encodings from {gallery_path.name}...")
     try:
-        with open(ENCODINGS_PATH, "rb") as f:
+        with open(gallery_path, "rb") as f:
             data = pickle.load(f)
 
         known_face_encodings = data["encodings"]
         known_student_ids = data["ids"]
         known_names = data["names"]
         print("Encodings loaded successfully.")
+        if prototypes:
+            warning = stale_prototypes_warning(data)
+            if warning:
+                print(f"WARNING: {warning}")
     except FileNotFoundError:
-        print(f"Error: Encodings file not found at {ENCODINGS_PATH}.")
-        print("Please run 'python src/cli.py encode' first.")
+        print(f"Error: Encodings file not found at {gallery_path}.")
+        if prototypes:
+            print("Please run 'python src/cli.py compact_gallery' first.")
+        else:
+            print("Please run 'python src/cli.py encode' first.")
         return
     except Exception as e:
         print(f"Error loading encodings file: {e}")
         return
 
-    # --- 2. Initialize Webcam ---
-    video_capture = cv2.VideoCapture(0)  # 0 is the default webcam
-    if not video_capture.isOpened():
-        print("Error: Could not open webcam.")
-        return
-    print("Starting webcam... Press 'q' to quit.")
-
-    # --- 3. Initialize variables for processing ---
-    # These will hold the locations and encodings of faces found in the *current* frame
-    face_locations = []
-    face_encodings = []
-
-    # This optimization processes only every other frame to save resources
-    process_this_frame = True
-
-    # --- 4. Start the Main Loop (runs for every frame) ---
-    while True:
-        # Grab a single frame of video
-        ret, frame = video_capture.read()
-        if not ret:
-            print("Error: Failed to grab frame.")
-            break
-
-        # --- Optimization ---
-        # Only process every other frame to speed things up
-        if process_this_frame:
-            # Resize frame to 1/4 size for faster processing
-            # (face_recognition works fine on smaller images)
-            small_frame = cv2.resize(frame, (0, 0), fx=0.25, fy=0.25)
-
-            # Convert the image from BGR (which OpenCV uses) to RGB (which face_recognition uses)
-            # We use slicing [:, :, ::-1] which is a fast way to reverse the channels (B,G,R) -> (R,G,B)
-            # Or you can use: rgb_small_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
-            rgb_small_frame = small_frame[:, :, ::-1]
-
-            # --- Find all faces and their encodings in the current frame ---
-            # 'face_locations' finds the (top, right, bottom, left) coordinates of faces
-            face_locations = face_recognition.face_locations(rgb_small_frame)
-
-            # 'face_encodings' gets the 128-point encoding for each face found
-            face_encodings = face_recognition.face_encodings(
-                rgb_small_frame, face_locations
-            )
-
-            # Loop through each face found in this frame
-            for face_encoding in face_encodings:
-                # --- Compare the found face with all known faces ---
-
-                # 'compare_faces' returns a list of True/False values
-                # e.g., [True, False, False] if it matched the first known person
-                matches = face_recognition.compare_faces(
-                    known_face_encodings, face_encoding
-                )
-
-                name = "Unknown"
-                student_id = None
-
-                # 'face_distance' gives a "distance" score for each comparison.
-                # A lower distance means a better match.
-                face_distances = face_recognition.face_distance(
-                    known_face_encodings, face_encoding
-                )
-
-                # 'np.argmin' finds the index (position) of the *lowest* distance
-                best_match_index = np.argmin(face_distances)
-
-                # If the best match's 'matches' value is True, we have a winner
-                if matches[best_match_index]:
-                    name = known_names[best_match_index]
-                    student_id = known_student_ids[best_match_index]
-
-                # --- Mark Attendance ---
-                if student_id:
-                    # Call our function from attendance.py
-                    mark_attendance(student_id, name)
-
-        # This toggles the flag so the *next* frame is skipped
-        process_this_frame = not process_this_frame
-
-        # --- 5. Display the Results (runs every frame) ---
-
-        # We draw boxes *after* the processing block, so the video looks smooth
-        # even on skipped frames (it just shows the boxes from the *last* processed frame)
-
-        # Loop through each face location *and* its determined name
-        # We zip `face_locations` (from processing) and the `name` (which we just found)
-        # Note: This part needs to be adjusted. We need to store names from the loop.
-
-        # Let's re-think: We should loop face_locations *and* encodings together.
-        # The logic above is slightly wrong. Let's fix it.
-
-        # (This is how the loop *should* be, inside 'if process_this_frame:')
-        # face_names_and_ids = []
-        # for face_encoding in face_encodings:
-        #    ... (comparison logic) ...
-        #    face_names_and_ids.append((name, student_id))
-
-        # (The original code is simpler, let's stick to it, but we need to display)
-
-        # --- 5. Display the Results (drawing boxes) ---
-        # This loop draws boxes on the *original, full-sized frame*
-
-        for (top, right, bottom, left), face_encoding in zip(
-            face_locations, face_encodings
-        ):
-            # --- Re-run comparison logic to get the name for this box ---
-            # (This is slightly inefficient, but easier to understand)
-            matches = face_recognition.compare_faces(
-                known_face_encodings, face_encoding
-            )
-            name = "Unknown"
-
-            face_distances = face_recognition.face_distance(
-                known_face_encodings, face_encoding
+    # With a compact gallery (GALLERY_STORAGE = "float16"/"int8") the full-precision
+    # encodings are only needed to re-score a few candidates, so we read them from
+    # the memory-mapped .npy file instead of keeping them all in RAM.
+    rescore_source = None
+    if GALLERY_STORAGE != "float64":
+        if prototypes:
+            # encodings.npy holds the full gallery, not the (small) prototypes
+            rescore_source = np.asarray(known_face_encodings, dtype=np.float64)
+        else:
+            rescore_source = load_rescore_source(known_face_encodings)
+
+    # Build the search backend chosen in config.py (MATCH_BACKEND).
+    # The "sharded" backend starts worker processes, so we must close it at the end.
+    matcher = create_matcher(known_face_encodings, rescore_source=rescore_source)
+
+    # Everything from here on holds resources (the matcher's workers, the camera,
+    # the recorder, a scratch database). try/finally releases them on every way
+    # out: an early return, the end of the input, 'q', or Ctrl-C (the only way
+    # to stop without a window).
+    video_capture = None
+    recorder = None
+    attendance_db = None
+    session_matcher = None
+    scheduler = None
+
+    # Counters for the summary printed at the end
+    frame_count = 0
+    processed_count = 0
+    start_time = time.perf_counter()
+    try:
+        # In session mode we also build a small matcher over just the roster's encodings
+        tracker = None
+        if session:
+            session_info = load_session(session)
+            if session_info is None:
+                return
+            session_matcher = SessionMatcher(
+                session_info, known_face_encodings, known_student_ids, matcher
             )
-            best_match_index = np.argmin(face_distances)
-
-            if matches[best_match_index]:
-                name = known_names[best_match_index]
-                # We don't need to call mark_attendance here, we did it in the logic block
-
-            # --- Draw the boxes ---
-
-            # Scale the face locations back up (we multiplied by 0.25 earlier)
-            top *= 4
-            right *= 4
-            bottom *= 4
-            left *= 4
-
-            # Draw a green box around the face
-            cv2.rectangle(frame, (left, top), (right, bottom), (0, 255, 0), 2)
-
-            # Draw a filled green rectangle for the name label
-            cv2.rectangle(
-                frame, (left, bottom - 35), (right, bottom), (0, 255, 0), cv2.FILLED
+            print(
+                f"Session '{session}': {len(session_info['roster'])} students on the roster, "
+                f"{len(session_info['marked'])} already marked."
             )
-            font = cv2.FONT_HERSHEY_DUPLEX
 
-            # Put the name text (in white) on the label
-            cv2.putText(
-                frame, name, (left + 6, bottom - 6), font, 1.0, (255, 255, 255), 1
+        # Sessions and the frame time budget both need to follow faces between frames
+        # (to know which ones we already recognised) and to choose which faces to encode.
+        if session_matcher or budget_ms is not None:
+            tracker = FaceTracker()
+            scheduler = FaceScheduler(budget_ms)
+
+        # The matcher keeps its own copy, so free the float64 list loaded from the pickle
+        del known_face_encodings, data
+
+        # --- 2. Initialize the frame source (webcam by default) ---
+        try:
+            video_capture = open_frame_source(source, realtime=realtime)
+        except (ValueError, OSError) as e:
+            print(f"Error: Could not open frame source '{source}': {e}")
+            return
+        if not video_capture.isOpened():
+            print(f"Error: Could not open frame source '{source}'.")
+            return
+        print(f"Reading frames from '{source}'... Press 'q' to quit.")
+
+        # Only a real camera writes to students.db by default. Replays, videos, image
+        # folders and synthetic scenes use recorded or made-up times, so their rows would
+        # pollute the real log, and the cooldown would see the rows of the previous replay.
+        if attendance is None:
+            attendance = "db" if video_capture.live else "scratch"
+        if attendance == "db":
+            attendance_db = DB_PATH
+        elif attendance == "scratch":
+            attendance_db = create_scratch_attendance_db()
+            print(
+                f"Attendance for this run goes to a scratch database: {attendance_db}"
             )
+        else:
+            print("Attendance marking is off for this run.")
+
+        # Students marked in students.db don't count when we aren't writing there
+        if session_matcher and attendance != "db":
+            session_matcher.marked.clear()
+
+        if record_dir:
+            try:
+                recorder = SessionRecorder(record_dir)
+            except OSError as e:
+                print(f"Error: Could not record to {record_dir}: {e}")
+                return
+
+        # --- 3. Initialize variables for processing ---
+        # These will hold the locations and encodings of faces found in the *current* frame
+        face_locations = []
+        face_encodings = []
+        face_names = []
+
+        # This optimization processes only every other frame to save resources
+        process_this_frame = True
+
+        # Reusable buffers for resizing/converting frames (see src/frame_processing.py)
+        processor = FrameProcessor(detector=face_detector)
+
+        start_time = time.perf_counter()  # time the loop only
+
+        # --- 4. Start the Main Loop (runs for every frame) ---
+        while True:
+            # Grab a single frame of video (into the same buffer every time)
+            ret, frame = processor.read(video_capture)
+            if not ret:
+                if video_capture.live:
+                    print("Error: Failed to grab frame.")
+                else:
+                    print("End of input reached.")
+                break
+
+            # The time this frame was taken (recorded time when replaying)
+            frame_time = datetime.fromtimestamp(video_capture.timestamp)
+            frame_count += 1
+
+            if recorder:
+                recorder.write(frame, video_capture.timestamp)
+
+            # --- Optimization ---
+            # Only process every other frame to speed things up
+            if process_this_frame:
+                processed_count += 1
+
+                # Resize frame to 1/4 size for faster processing
+                # (face_recognition works fine on smaller images)
+                # and convert it from BGR (which OpenCV uses) to RGB (which face_recognition uses).
+                # Both steps write into buffers that are reused for every frame,
+                # and the result is contiguous so dlib doesn't need to copy it.
+                rgb_small_frame = processor.prepare(frame)
+
+                if scheduler:
+                    face_locations, face_names = process_tracked_frame(
+                        processor,
+                        rgb_small_frame,
+                        tracker,
+                        scheduler,
+                        matcher,
+                        known_student_ids,
+                        known_names,
+                        frame_time,
+                        session_matcher,
+                        attendance_db,
+                    )
+                else:
+                    # --- Find all faces and their encodings in the current frame ---
+                    # 'face_locations' are the (top, right, bottom, left) coordinates of faces
+                    # 'face_encodings' are the 128-point encodings for each face found
+                    face_locations, face_encodings = processor.detect_and_encode(
+                        rgb_small_frame
+                    )
+
+                    # --- Compare the found faces with all known faces ---
+                    # 'find_best_matches' gives the gallery index of the closest known face
+                    # for every encoding, or None if nobody is within MATCH_THRESHOLD.
+                    best_matches = find_best_matches(matcher, face_encodings)
+
+                    face_names = []
+                    for best_match_index in best_matches:
+                        name = "Unknown"
+                        student_id = None
+
+                        if best_match_index is not None:
+                            name = known_names[best_match_index]
+                            student_id = known_student_ids[best_match_index]
+
+                        face_names.append(name)
+
+                        # --- Mark Attendance ---
+                        if student_id and attendance_db:
+                            # Call our function from attendance.py
+                            mark_attendance(student_id, name, frame_time, attendance_db)
+
+            # This toggles the flag so the *next* frame is skipped
+            process_this_frame = not process_this_frame
+
+            # Without a window there is nothing to draw and no 'q' key to wait for
+            if not display:
+                continue
+
+            # --- 5. Display the Results (runs every frame) ---
+            # We draw boxes *after* the processing block, so the video looks smooth
+            # even on skipped frames (it just shows the boxes and names from the
+            # *last* processed frame, so we don't need to match them again here)
+
+            # This loop draws boxes on the *original, full-sized frame*
+
+            for location, name in zip(face_locations, face_names):
+                # --- Draw the boxes ---
+
+                # Scale the face locations back up (we multiplied by 0.25 earlier)
+                top, right, bottom, left = processor.full_size_box(location)
+
+                # Draw a green box around the face
+                cv2.rectangle(frame, (left, top), (right, bottom), (0, 255, 0), 2)
+
+                # Draw a filled green rectangle for the name label
+                cv2.rectangle(
+                    frame, (left, bottom - 35), (right, bottom), (0, 255, 0), cv2.FILLED
+                )
+                font = cv2.FONT_HERSHEY_DUPLEX
 
-        # Display the resulting image in a window
-        cv2.imshow("Attendance System", frame)
-
-        # --- 6. Check for 'q' key to quit ---
-        if cv2.waitKey(1) & 0xFF == ord("q"):
-            print("Quitting...")
-            break
+                # Put the name text (in white) on the label
+                cv2.putText(
+                    frame, name, (left + 6, bottom - 6), font, 1.0, (255, 255, 255), 1
+                )
 
-    # --- 7. Clean up ---
-    video_capture.release()
-    cv2.destroyAllWindows()
+            # Display the resulting image in a window
+            cv2.imshow("Attendance System", frame)
+
+            # --- 6. Check for 'q' key to quit ---
+            if cv2.waitKey(1) & 0xFF == ord("q"):
+                print("Quitting...")
+                break
+    except KeyboardInterrupt:
+        print("Interrupted, stopping...")
+
+    finally:
+        # --- 7. Clean up ---
+        if video_capture:
+            video_capture.release()
+        if recorder:
+            recorder.close()
+        if display:
+            cv2.destroyAllWindows()
+        matcher.close()
+        if attendance_db and attendance_db != DB_PATH:
+            if keep_scratch:
+                print(f"Scratch attendance database kept at {attendance_db}")
+            else:
+                os.remove(attendance_db)
+                print("Scratch attendance database removed (--keep-scratch keeps it).")
+
+    elapsed = time.perf_counter() - start_time
+    print(
+        f"Read {frame_count} frames ({processed_count} processed) in {elapsed:.1f}s"
+        f" = {frame_count / max(elapsed, 1e-9):.1f} FPS"
+    )
+    if scheduler:
+        scheduler.report()
+    if session_matcher:
+        session_matcher.report()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,191 @@
+# This module decides which faces to encode on each processed frame when
+# there isn't time to encode all of them.
+#
+# When a crowd walks in, encoding 20 faces can take seconds and the video
+# freezes. With a time budget (FRAME_BUDGET_MS) we encode the most useful
+# faces first and stop when the budget runs out. The faces we didn't get to
+# are kept (with a copy of their image) and encoded on the next frames,
+# so nobody is dropped.
+#
+# Faces are encoded one at a time (so we can stop when the budget runs out),
+# straight from the frame or a saved crop. This path doesn't use the
+# FrameProcessor's locations/encodings buffers; it allocates one small
+# array per encoded face, which is cheap next to the encoding itself.
+
+import time
+import face_recognition
+from config.config import FRAME_BUDGET_MS
+
+# How much each property adds to a face's priority (higher = encoded sooner)
+UNRESOLVED_WEIGHT = 2.0  # we don't know who this is yet
+NEW_FACE_WEIGHT = 1.0  # the face appeared on this frame
+WAITING_WEIGHT = 0.5  # per frame the face has already been deferred
+SIZE_WEIGHT = 1.0  # times face height / image height (big faces encode reliably)
+
+
+class WorkItem:
+    """One face waiting to be encoded: where it is, and in which image."""
+
+    def __init__(
+        self, track, image, location, frame_time, is_new, waited, face_size=None
+    ):
+        self.track = track
+        self.image = image
+        self.location = location  # (top, right, bottom, left) inside 'image'
+        self.frame_time = frame_time  # when the face was seen (for attendance)
+        self.is_new = is_new
+        self.waited = waited  # how many frames it has been deferred
+        self.is_copy = face_size is not None
+
+        # Face height as a share of the frame height. A saved copy is much
+        # smaller than the frame, so it keeps the size it had in the frame.
+        if face_size is None:
+            face_size = (location[2] - location[0]) / float(image.shape[0])
+        self.face_size = face_size
+
+    def priority(self):
+        return (
+            UNRESOLVED_WEIGHT * (self.track.student_id is None)
+            + NEW_FACE_WEIGHT * self.is_new
+            + WAITING_WEIGHT * self.waited
+            + SIZE_WEIGHT * self.face_size
+        )
+
+    def deferred_copy(self, margin=0.5):
+        """
+        Returns this face as a WorkItem for a later frame. The frame buffer is
+        reused, so we copy just the face (plus a margin) out of it.
+        """
+        if self.is_copy:
+            self.waited += 1
+            return self
+
+        top, right, bottom, left = self.location
+        height, width = self.image.shape[:2]
+        pad_y = int((bottom - top) * margin)
+        pad_x = int((right - left) * margin)
+        y0, y1 = max(0, top - pad_y), min(height, bottom + pad_y)
+        x0, x1 = max(0, left - pad_x), min(width, right + pad_x)
+
+        return WorkItem(
+            self.track,
+            self.image[y0:y1, x0:x1].copy(),
+            (top - y0, right - x0, bottom - y0, left - x0),
+            self.frame_time,
+            False,
+            self.waited + 1,
+            face_size=self.face_size,
+        )
+
+
+class FaceScheduler:
+    """
+    Encodes faces in priority order until 'budget_ms' milliseconds have been
+    used on this frame (None = no limit). At least one face is always encoded
+    per frame, so a tiny budget still makes progress.
+
+    Counters:
+      budget_overruns - frames that went over the budget
+      deferred_faces  - times a face was put off to a later frame
+      faces_skipped   - faces 'skip' said didn't need encoding
+    """
+
+    def __init__(self, budget_ms=FRAME_BUDGET_MS):
+        self.budget_ms = budget_ms
+        self.pending = {}  # track_id -> WorkItem deferred from an earlier frame
+        self.waiting = {}  # track_id -> frames a recognised face's re-check has waited
+        self.frames = 0
+        self.faces_encoded = 0
+        self.budget_overruns = 0
+        self.deferred_faces = 0
+        self.faces_skipped = 0
+
+    def process(self, tracks, rgb, frame_time, frame_number, match, skip=None):
+        """
+        Encodes and matches the faces in 'tracks' (plus any deferred ones).
+
+        match(encodings) -> list of gallery indices (or None), one per encoding
+        skip(track)      -> True if this face doesn't need encoding at all
+
+        Returns a list of (track, gallery_index, frame_time) for every face
+        that was encoded on this frame.
+        """
+        start = time.perf_counter()
+        self.frames += 1
+
+        # --- 1. Collect the work: faces in this frame, then deferred faces ---
+        items = []
+        for track in tracks:
+            earlier = self.pending.pop(track.track_id, None)
+            waited = self.waiting.pop(track.track_id, 0)
+            if skip and skip(track):
+                self.faces_skipped += 1
+                continue
+            items.append(
+                WorkItem(
+                    track,
+                    rgb,
+                    track.box,
+                    frame_time,
+                    track.first_seen == frame_number,
+                    earlier.waited if earlier else waited,
+                )
+            )
+        # Faces that left the picture before we got to them: use the saved copy
+        for item in self.pending.values():
+            if not (skip and skip(item.track)):
+                items.append(item)
+        self.pending = {}
+        self.waiting = {}
+
+        items.sort(key=lambda item: item.priority(), reverse=True)
+
+        # --- 2. Encode in priority order until the budget is used up ---
+        encoded = []
+        encodings = []
+        for n, item in enumerate(items):
+            if n > 0 and self.budget_ms is not None:
+                if (time.perf_counter() - start) * 1000 >= self.budget_ms:
+                    self.defer(items[n:])
+                    break
+
+            result = face_recognition.face_encodings(item.image, [item.location])
+            if result:
+                encoded.append(item)
+                encodings.append(result[0])
+
+        self.faces_encoded += len(encoded)
+
+        # --- 3. Match everything we encoded in one go ---
+        matches = match(encodings) if encodings else []
+
+        if self.budget_ms is not None:
+            if (time.perf_counter() - start) * 1000 > self.budget_ms:
+                self.budget_overruns += 1
+
+        return [
+            (item.track, index, item.frame_time)
+            for item, index in zip(encoded, matches)
+        ]
+
+    def defer(self, items):
+        """
+        Keeps the unknown faces we ran out of time for.
+        Faces we already recognised don't need saving (they keep their name), but
+        we remember how long their re-check has waited so it isn't put off forever.
+        """
+        for item in items:
+            if item.track.student_id is not None:
+                self.waiting[item.track.track_id] = item.waited + 1
+                self.deferred_faces += 1
+                continue
+            self.pending[item.track.track_id] = item.deferred_copy()
+            self.deferred_faces += 1
+
+    def report(self):
+        print(
+            f"Scheduler: {self.faces_encoded} faces encoded over {self.frames} frames, "
+            f"{self.faces_skipped} skipped as already recognised, "
+            f"{self.deferred_faces} deferrals, {len(self.pending)} still waiting, "
+            f"{self.budget_overruns} frames over the {self.budget_ms} ms budget"
+        )
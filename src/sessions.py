@@ -0,0 +1,221 @@
+# This module handles class sessions: a scheduled lecture with a known roster.
+# In a lecture almost every face belongs to the ~60 students on the roster,
+# so 'run --session' compares faces against the roster's encodings first and
+# only searches the whole gallery when nobody on the roster matches.
+
+import csv
+import sqlite3
+import numpy as np
+from datetime import datetime
+from config.config import DB_PATH
+from src.matcher import LinearMatcher, find_best_matches
+
+# --- Creating sessions ---
+
+
+def read_roster_file(roster_path):
+    """
+    Reads student IDs from a CSV file. The file can have a 'student_id' column,
+    or just one ID per line (the first column is used).
+    """
+    with open(roster_path, newline="") as f:
+        rows = [row for row in csv.reader(f) if row and row[0].strip()]
+
+    if not rows:
+        return []
+
+    header = [cell.strip().lower() for cell in rows[0]]
+    if "student_id" in header:
+        column = header.index("student_id")
+        return [row[column].strip() for row in rows[1:] if len(row) > column]
+
+    return [row[0].strip() for row in rows]
+
+
+def add_session(session_id, name, starts_at, ends_at, roster_path):
+    """
+    Adds (or replaces) a session and its roster in the database.
+    'starts_at' / 'ends_at' use the same format as attendance: "YYYY-MM-DD HH:MM:SS".
+    """
+
+    roster = read_roster_file(roster_path)
+    if not roster:
+        print(f"No student IDs found in {roster_path}.")
+        return
+
+    conn = None
+    try:
+        conn = sqlite3.connect(str(DB_PATH))
+        c = conn.cursor()
+
+        # Warn about IDs that aren't enrolled (they can't be recognised anyway)
+        c.execute("SELECT student_id FROM students")
+        enrolled = {row[0] for row in c.fetchall()}
+        unknown = [student_id for student_id in roster if student_id not in enrolled]
+        if unknown:
+            print(
+                f"WARNING: {len(unknown)} roster IDs are not enrolled: {unknown[:10]}"
+            )
+
+        c.execute(
+            "INSERT OR REPLACE INTO sessions (session_id, name, starts_at, ends_at) "
+            "VALUES (?, ?, ?, ?)",
+            (session_id, name, starts_at, ends_at),
+        )
+        c.execute("DELETE FROM session_roster WHERE session_id = ?", (session_id,))
+        c.executemany(
+            "INSERT OR IGNORE INTO session_roster (session_id, student_id) VALUES (?, ?)",
+            [
+                (session_id, student_id)
+                for student_id in roster
+                if student_id in enrolled
+            ],
+        )
+        conn.commit()
+        print(
+            f"Session '{session_id}' saved with {len(roster) - len(unknown)} students."
+        )
+
+    except sqlite3.Error as e:
+        print(f"Database error while adding session: {e}")
+
+    finally:
+        if conn:
+            conn.close()
+
+
+# --- Loading a session for 'run' ---
+
+
+def load_session(session_id):
+    """
+    Returns the session as a dictionary (session_id, name, starts_at, ends_at,
+    roster, marked) or None if it doesn't exist.
+    'marked' is the set of students who already have attendance since the
+    session started, so we don't keep re-recognising them.
+    """
+
+    conn = None
+    try:
+        conn = sqlite3.connect(str(DB_PATH))
+        c = conn.cursor()
+
+        c.execute(
+            "SELECT session_id, name, starts_at, ends_at FROM sessions WHERE session_id = ?",
+            (session_id,),
+        )
+        row = c.fetchone()
+        if not row:
+            print(f"Error: Session '{session_id}' not found. Use 'add_session' first.")
+            return None
+
+        session = {
+            "session_id": row[0],
+            "name": row[1],
+            "starts_at": row[2] or datetime.now().strftime("%Y-%m-%d 00:00:00"),
+            "ends_at": row[3] or "9999-12-31 23:59:59",
+        }
+
+        c.execute(
+            "SELECT student_id FROM session_roster WHERE session_id = ?", (session_id,)
+        )
+        session["roster"] = {r[0] for r in c.fetchall()}
+
+        c.execute(
+            "SELECT DISTINCT student_id FROM attendance WHERE timestamp >= ? AND timestamp <= ?",
+            (session["starts_at"], session["ends_at"]),
+        )
+        session["marked"] = {r[0] for r in c.fetchall()}
+        return session
+
+    except sqlite3.Error as e:
+        print(f"Database error while loading session: {e}")
+        return None
+
+    finally:
+        if conn:
+            conn.close()
+
+
+# --- Matching with the roster first ---
+
+
+class SessionMatcher:
+    """
+    Matches face encodings against the session roster first, and against
+    the full gallery ('full_matcher') only when nobody on the roster matches.
+    Returns full-gallery indices, just like find_best_matches, and counts how
+    many encoding comparisons this saved.
+    """
+
+    def __init__(self, session, known_face_encodings, known_student_ids, full_matcher):
+        self.session = session
+        self.marked = set(session["marked"])
+        self.full_matcher = full_matcher
+
+        # Gallery rows that belong to roster students, and a matcher over just those
+        self.roster_rows = np.array(
+            [i for i, sid in enumerate(known_student_ids) if sid in session["roster"]],
+            dtype=np.int64,
+        )
+        gallery = np.asarray(known_face_encodings, dtype=np.float64).reshape(-1, 128)
+        self.roster_matcher = LinearMatcher(gallery[self.roster_rows])
+
+        # Counters for the report
+        self.faces_matched = 0
+        self.roster_misses = 0
+        self.encodes_skipped = 0
+        self.comparisons = 0
+
+    def match(self, face_encodings):
+        """Returns the full-gallery index of each face's best match, or None."""
+        if len(face_encodings) == 0:
+            return []
+
+        self.faces_matched += len(face_encodings)
+        self.comparisons += len(face_encodings) * len(self.roster_matcher)
+
+        results = []
+        misses = []
+        for i, roster_index in enumerate(
+            find_best_matches(self.roster_matcher, face_encodings)
+        ):
+            if roster_index is None:
+                misses.append(i)
+                results.append(None)
+            else:
+                results.append(int(self.roster_rows[roster_index]))
+
+        # Faces of people not on the roster: fall back to the whole gallery
+        if misses:
+            self.roster_misses += len(misses)
+            self.comparisons += len(misses) * len(self.full_matcher)
+            miss_encodings = [face_encodings[i] for i in misses]
+            for i, index in zip(
+                misses, find_best_matches(self.full_matcher, miss_encodings)
+            ):
+                results[i] = index
+
+        return results
+
+    def report(self):
+        """Prints how much work the session mode saved."""
+        # Without a session every detected face (including the skipped ones)
+        # would have been compared with the whole gallery.
+        faces_seen = self.faces_matched + self.encodes_skipped
+        without_session = faces_seen * len(self.full_matcher)
+        saved = without_session - self.comparisons
+
+        print(f"--- Session '{self.session['session_id']}' report ---")
+        print(
+            f"Roster: {len(self.session['roster'])} students, {len(self.marked)} marked"
+        )
+        print(
+            f"Faces: {faces_seen} seen, {self.faces_matched} encoded and matched, "
+            f"{self.encodes_skipped} skipped (already marked)"
+        )
+        print(f"Roster misses (searched full gallery): {self.roster_misses}")
+        print(
+            f"Comparisons: {self.comparisons} instead of {without_session} "
+            f"(saved {saved}, {saved / max(without_session, 1):.0%})"
+        )
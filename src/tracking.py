@@ -0,0 +1,92 @@
+# This module follows faces from one processed frame to the next.
+# If a box in this frame overlaps a box from the last frame enough, we assume
+# it's the same person, so we can remember who they are instead of
+# encoding and matching their face again on every frame.
+
+
+class Track:
+    """One face being followed across frames."""
+
+    def __init__(self, track_id, box, frame_number):
+        self.track_id = track_id
+        self.box = box  # (top, right, bottom, left)
+        self.first_seen = frame_number
+        self.student_id = None  # Filled in once the face has been recognised
+        self.matched_at = None  # Frame number of the last encode + match
+        self.name = "Unknown"
+        self.missed = 0  # Processed frames in a row where it wasn't seen
+
+    @property
+    def area(self):
+        top, right, bottom, left = self.box
+        return max(0, bottom - top) * max(0, right - left)
+
+
+def box_iou(a, b):
+    """Intersection-over-union of two (top, right, bottom, left) boxes (0 to 1)."""
+    top = max(a[0], b[0])
+    right = min(a[1], b[1])
+    bottom = min(a[2], b[2])
+    left = max(a[3], b[3])
+    overlap = max(0, bottom - top) * max(0, right - left)
+    if overlap == 0:
+        return 0.0
+    area_a = (a[2] - a[0]) * (a[1] - a[3])
+    area_b = (b[2] - b[0]) * (b[1] - b[3])
+    return overlap / float(area_a + area_b - overlap)
+
+
+class FaceTracker:
+    """
+    Matches each new box to the existing track it overlaps most
+    (if the overlap is at least 'iou_threshold'), and starts new tracks
+    for the rest. Tracks not seen for 'max_missed' processed frames are dropped.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_missed=5):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.tracks = []
+        self.next_id = 1
+        self.frame_number = 0
+
+    def update(self, boxes):
+        """Returns one Track per box in 'boxes', in the same order."""
+        self.frame_number += 1
+        boxes = [tuple(int(v) for v in box) for box in boxes]
+
+        # Every (overlap, track, box) pair, best overlaps first
+        pairs = []
+        for t, track in enumerate(self.tracks):
+            for b, box in enumerate(boxes):
+                iou = box_iou(track.box, box)
+                if iou >= self.iou_threshold:
+                    pairs.append((iou, t, b))
+        pairs.sort(reverse=True)
+
+        result = [None] * len(boxes)
+        used_tracks = set()
+        for _, t, b in pairs:
+            if t in used_tracks or result[b] is not None:
+                continue
+            track = self.tracks[t]
+            track.box = boxes[b]
+            track.missed = 0
+            result[b] = track
+            used_tracks.add(t)
+
+        # Tracks that weren't seen this time
+        for t, track in enumerate(self.tracks):
+            if t not in used_tracks:
+                track.missed += 1
+        self.tracks = [t for t in self.tracks if t.missed <= self.max_missed]
+
+        # New faces get new tracks
+        for b, box in enumerate(boxes):
+            if result[b] is None:
+                track = Track(self.next_id, box, self.frame_number)
+                self.next_id += 1
+                self.tracks.append(track)
+                result[b] = track
+
+        return result
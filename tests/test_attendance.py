@@ -0,0 +1,29 @@
+# test_attendance.py
+import os
+import sqlite3
+from datetime import datetime
+from src.attendence import mark_attendance
+from src.db import create_scratch_attendance_db
+
+
+def count_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM attendance").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_replays_into_scratch_databases_are_repeatable():
+    seen_at = datetime(2026, 1, 5, 9, 0, 0)
+    results = []
+    for _ in range(2):  # the same "replay" twice
+        db_path = create_scratch_attendance_db()
+        try:
+            mark_attendance("S1", "Ann", seen_at, db_path)
+            mark_attendance("S1", "Ann", seen_at, db_path)  # within the cooldown
+            results.append(count_rows(db_path))
+        finally:
+            os.remove(db_path)
+
+    assert results == [1, 1]
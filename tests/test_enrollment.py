@@ -0,0 +1,84 @@
+# test_enrollment.py
+import sqlite3
+from pathlib import Path
+import numpy as np
+from src import enrollment
+from src.enrollment import (
+    read_enrollment_roster,
+    find_photos,
+    copy_name,
+    add_students,
+)
+
+
+def test_roster_skips_blank_and_repeated_rows(tmp_path):
+    roster = tmp_path / "intake.csv"
+    roster.write_text(
+        "Student_ID,Name\nS1,Ann\nS2,Bob\n,Nobody\nS1,Ann again\nS3, Cy \n"
+    )
+
+    students, problems = read_enrollment_roster(roster)
+
+    assert students == [("S1", "Ann"), ("S2", "Bob"), ("S3", "Cy")]
+    assert len(problems) == 2
+
+
+def test_photos_found_in_subfolders_and_by_name(tmp_path):
+    (tmp_path / "S1").mkdir()
+    for name in (
+        "S1/a.jpg",
+        "S1/b.png",
+        "S1/notes.txt",
+        "S2.jpg",
+        "S2_2.jpg",
+        "S22.jpg",
+    ):
+        (tmp_path / name).write_bytes(b"")
+
+    photos = find_photos(tmp_path, ["S1", "S2", "S3"])
+
+    assert [p.name for p in photos["S1"]] == ["a.jpg", "b.png"]
+    assert [p.name for p in photos["S2"]] == ["S2.jpg", "S2_2.jpg"]
+    assert photos["S3"] == []
+
+
+def test_copies_of_same_named_photos_do_not_collide():
+    names = {copy_name(Path(name)) for name in ("S2.jpg", "S2.png", "S2.JPG")}
+
+    assert len(names) == 3
+    assert all(name.endswith(".jpg") for name in names)
+
+
+def test_photo_errors_become_rejections(tmp_path, monkeypatch):
+    photo = tmp_path / "S1.jpg"
+    task = ("S1", photo, tmp_path / "known" / copy_name(photo))
+
+    class BrokenDetector:
+        def detect(self, image):
+            raise OSError("disk full")
+
+    monkeypatch.setattr(
+        enrollment.face_recognition,
+        "load_image_file",
+        lambda path: np.zeros((10, 10, 3), dtype=np.uint8),
+    )
+    monkeypatch.setattr(enrollment, "_worker_detector", BrokenDetector())
+    assert enrollment._encode_photo(task)[1:] == (None, "error: disk full")
+
+    monkeypatch.setattr(enrollment, "_worker_error", "detector error: no model")
+    assert enrollment._encode_photo(task)[1:] == (None, "detector error: no model")
+
+
+def test_enrolled_students_keep_their_database_name(tmp_path, monkeypatch):
+    db_path = tmp_path / "students.db"
+    monkeypatch.setattr(enrollment, "DB_PATH", db_path)
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("CREATE TABLE students (student_id TEXT PRIMARY KEY, name TEXT)")
+    conn.execute("INSERT INTO students VALUES ('S1', 'Ann Smith')")
+    conn.commit()
+    conn.close()
+
+    added, names = add_students([("S1", "Ann"), ("S2", "Bob")])
+
+    assert added == 1
+    assert names == {"S1": "Ann Smith", "S2": "Bob"}
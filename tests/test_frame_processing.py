@@ -0,0 +1,15 @@
+# test_frame_processing.py
+import numpy as np
+from src.frame_processing import FrameProcessor
+
+
+def test_buffers_grow_instead_of_dropping_faces():
+    processor = FrameProcessor(max_faces=2)
+    rgb = np.zeros((120, 400, 3), dtype=np.uint8)
+    boxes = [(10, 40 + 40 * i, 40, 10 + 40 * i) for i in range(5)]
+
+    locations, encodings = processor.detect_and_encode(rgb, boxes)
+
+    assert processor.max_faces >= 5
+    assert [tuple(box) for box in locations] == boxes
+    assert encodings.shape == (5, 128)
@@ -0,0 +1,124 @@
+# test_live_view.py
+import sqlite3
+from datetime import datetime
+import pytest
+from src.db import CREATE_ATTENDANCE_TABLE, CREATE_ATTENDANCE_INDEX
+from src.live_view import AttendancePoller
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """An attendance database in WAL mode, like the one create_database makes."""
+    path = tmp_path / "students.db"
+    conn = sqlite3.connect(str(path))
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(CREATE_ATTENDANCE_TABLE)
+    conn.execute(CREATE_ATTENDANCE_INDEX)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def add_rows(db_path, rows):
+    conn = sqlite3.connect(str(db_path))
+    conn.executemany(
+        "INSERT INTO attendance (student_id, name, timestamp) VALUES (?, ?, ?)", rows
+    )
+    conn.commit()
+    conn.close()
+
+
+def drain(poller):
+    updates = []
+    while not poller.updates.empty():
+        updates.append(poller.updates.get())
+    return updates
+
+
+def test_only_new_rows_are_read(db_path):
+    add_rows(db_path, [("S1", "Ann", "2026-10-19 09:00:00")])
+    poller = AttendancePoller(db_path, since="2026-10-19 00:00:00")
+    conn = poller.connect()
+    poller.skip_to_since(conn)
+
+    assert len(poller.poll(conn)) == 1
+    add_rows(
+        db_path,
+        [("S2", "Bob", "2026-10-19 09:05:00"), ("S1", "Ann", "2026-10-19 09:10:00")],
+    )
+    assert len(poller.poll(conn)) == 2
+    assert poller.poll(conn) == []
+    conn.close()
+
+    assert drain(poller) == [
+        [("S1", "Ann", 1, "2026-10-19 09:00:00", "2026-10-19 09:00:00")],
+        [
+            ("S2", "Bob", 1, "2026-10-19 09:05:00", "2026-10-19 09:05:00"),
+            ("S1", "Ann", 2, "2026-10-19 09:00:00", "2026-10-19 09:10:00"),
+        ],
+    ]
+
+
+def test_rows_are_read_in_batches(db_path):
+    add_rows(db_path, [(f"S{i}", "X", "2026-10-19 09:00:00") for i in range(7)])
+    poller = AttendancePoller(db_path, since="2026-10-19 00:00:00")
+    poller.batch_size = 3
+    conn = poller.connect()
+    poller.skip_to_since(conn)
+
+    sizes = [len(poller.poll(conn)) for _ in range(4)]
+    conn.close()
+
+    assert sizes == [3, 3, 1, 0]
+    assert len(poller.summary) == 7
+
+
+def test_start_up_skips_earlier_days(db_path):
+    add_rows(db_path, [("S1", "Ann", "2026-10-18 09:00:00")] * 5)
+    poller = AttendancePoller(db_path, since="2026-10-19 00:00:00")
+    conn = poller.connect()
+
+    poller.skip_to_since(conn)
+    assert poller.last_id == 5  # nothing today yet: start after the newest row
+
+    add_rows(db_path, [("S2", "Bob", "2026-10-19 08:00:00")])
+    poller.skip_to_since(conn)
+    assert poller.last_id == 5  # start at today's first row
+    conn.close()
+
+
+def test_count_starts_again_at_midnight(db_path):
+    add_rows(db_path, [("S1", "Ann", "2026-10-19 23:50:00")])
+    poller = AttendancePoller(db_path)
+    poller.since = "2026-10-19 00:00:00"  # as if opened on the 19th
+    conn = poller.connect()
+    poller.skip_to_since(conn)
+    poller.poll(conn, now=datetime(2026, 10, 19, 23, 55))
+    assert set(poller.summary) == {"S1"}
+
+    add_rows(db_path, [("S2", "Bob", "2026-10-20 08:00:00")])
+    poller.poll(conn, now=datetime(2026, 10, 20, 8, 1))
+    conn.close()
+
+    assert poller.since == "2026-10-20 00:00:00"
+    assert set(poller.summary) == {"S2"}
+    assert drain(poller)[1:] == [
+        AttendancePoller.NEW_DAY,
+        [("S2", "Bob", 1, "2026-10-20 08:00:00", "2026-10-20 08:00:00")],
+    ]
+
+
+def test_thread_sends_updates_until_stopped(db_path):
+    add_rows(db_path, [("S1", "Ann", "2026-10-19 09:00:00")])
+    poller = AttendancePoller(db_path, since="2026-10-19 00:00:00", interval=0.01)
+    poller.start()
+    try:
+        first = poller.updates.get(timeout=5)
+        add_rows(db_path, [("S2", "Bob", "2026-10-19 09:01:00")])
+        second = poller.updates.get(timeout=5)
+    finally:
+        poller.stop()
+        poller.join(timeout=5)
+
+    assert [update[0] for update in first + second] == ["S1", "S2"]
+    assert not poller.is_alive()
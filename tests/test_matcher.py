@@ -0,0 +1,63 @@
+# test_matcher.py
+import numpy as np
+from src.matcher import (
+    LinearMatcher,
+    SharedMemoryMatcher,
+    QuantizedMatcher,
+    find_best_matches,
+)
+
+
+def make_gallery(rows=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    gallery = rng.normal(0.0, 0.09, size=(rows, 128))
+    queries = gallery[:5] + rng.normal(0.0, 0.01, size=(5, 128))
+    return gallery, queries
+
+
+def test_linear_matches_face_distance():
+    """The blocked search must give the same answer as the original argmin loop."""
+    gallery, queries = make_gallery()
+    matcher = LinearMatcher(gallery)
+
+    distances, indices = matcher.search(queries, k=3)
+
+    for i, query in enumerate(queries):
+        face_distances = np.linalg.norm(gallery - query, axis=1)
+        assert indices[i, 0] == np.argmin(face_distances)
+        assert distances[i, 0] == face_distances[indices[i, 0]]
+
+
+def test_sharded_matches_linear():
+    gallery, queries = make_gallery()
+    matcher = SharedMemoryMatcher(gallery, workers=2, block_rows=256)
+    try:
+        sharded = matcher.search(queries, k=4)
+    finally:
+        matcher.close()
+
+    linear = LinearMatcher(gallery).search(queries, k=4)
+    assert np.array_equal(sharded[1], linear[1])
+    assert np.allclose(sharded[0], linear[0])
+
+
+def test_find_best_matches_applies_threshold():
+    gallery, queries = make_gallery()
+    matcher = LinearMatcher(gallery)
+
+    far_away = np.full((1, 128), 5.0)
+    matches = find_best_matches(matcher, np.vstack([queries[:1], far_away]))
+
+    assert matches == [0, None]
+
+
+def test_quantized_with_rescore_matches_linear():
+    """float16/int8 galleries must give exact results once candidates are re-scored."""
+    gallery, queries = make_gallery()
+    linear = LinearMatcher(gallery).search(queries, k=1)
+
+    for storage in ("float16", "int8"):
+        matcher = QuantizedMatcher(gallery, storage=storage, rescore_source=gallery)
+        distances, indices = matcher.search(queries, k=1)
+        assert np.array_equal(indices, linear[1])
+        assert np.array_equal(distances, linear[0])
@@ -0,0 +1,100 @@
+# test_partitions.py
+import sqlite3
+from datetime import datetime
+import pytest
+from src import partitions
+from src.db import CREATE_ATTENDANCE_TABLE, CREATE_ATTENDANCE_INDEX
+from src.partitions import (
+    archive_attendance,
+    last_attendance_time,
+    open_all_attendance,
+)
+
+
+@pytest.fixture
+def databases(tmp_path, monkeypatch):
+    """A students.db and an archive file under tmp_path, used by partitions."""
+    db_path = tmp_path / "students.db"
+    archive_dir = tmp_path / "archive"
+    archive_path = archive_dir / "attendance_archive.db"
+    monkeypatch.setattr(partitions, "DB_PATH", db_path)
+    monkeypatch.setattr(partitions, "ARCHIVE_DIR", archive_dir)
+    monkeypatch.setattr(partitions, "ARCHIVE_PATH", archive_path)
+
+    conn = sqlite3.connect(str(db_path))
+    conn.execute(CREATE_ATTENDANCE_TABLE)
+    conn.execute(CREATE_ATTENDANCE_INDEX)
+    conn.commit()
+    conn.close()
+    return db_path, archive_path
+
+
+def add_rows(db_path, rows):
+    conn = sqlite3.connect(str(db_path))
+    conn.executemany(
+        "INSERT INTO attendance (student_id, name, timestamp) VALUES (?, ?, ?)", rows
+    )
+    conn.commit()
+    conn.close()
+
+
+def all_rows(db_path, archive_path):
+    conn = open_all_attendance(db_path, archive_path)
+    try:
+        return conn.execute(
+            "SELECT student_id, timestamp FROM attendance_all ORDER BY timestamp"
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+def test_archive_keeps_current_month_and_view_sees_everything(databases):
+    db_path, archive_path = databases
+    rows = [
+        ("S1", "Ann", "2026-08-03 09:00:00"),
+        ("S2", "Bob", "2026-09-10 09:00:00"),
+        ("S1", "Ann", "2026-10-01 09:00:00"),
+    ]
+    add_rows(db_path, rows)
+    now = datetime(2026, 10, 19, 12, 0, 0)
+
+    archive_attendance(keep_months=1, now=now)
+    archive_attendance(keep_months=1, now=now)  # nothing left to move
+
+    conn = sqlite3.connect(str(db_path))
+    hot = conn.execute("SELECT timestamp FROM attendance").fetchall()
+    conn.close()
+    assert hot == [("2026-10-01 09:00:00",)]
+    assert all_rows(db_path, archive_path) == [(sid, ts) for sid, _, ts in rows]
+
+
+def test_archive_over_more_years_than_sqlite_can_attach(databases):
+    db_path, archive_path = databases
+    rows = [("S1", "Ann", f"{year}-03-01 09:00:00") for year in range(2010, 2026)]
+    add_rows(db_path, rows)
+
+    archive_attendance(keep_months=1, now=datetime(2026, 10, 19))
+
+    assert len(all_rows(db_path, archive_path)) == len(rows)
+
+
+def test_last_attendance_time_falls_back_to_newest_partition(databases):
+    db_path, _ = databases
+    add_rows(
+        db_path,
+        [
+            ("S1", "Ann", "2026-09-30 23:59:00"),
+            ("S2", "Bob", "2026-10-02 08:00:00"),
+        ],
+    )
+    archive_attendance(keep_months=1, now=datetime(2026, 10, 19))
+
+    conn = sqlite3.connect(str(db_path))
+    c = conn.cursor()
+    try:
+        assert last_attendance_time(c, "S2") == "2026-10-02 08:00:00"
+        assert last_attendance_time(c, "S1") == "2026-09-30 23:59:00"
+        assert last_attendance_time(c, "S1", check_archives=False) is None
+        assert last_attendance_time(c, "S3") is None
+    finally:
+        conn.close()
@@ -0,0 +1,73 @@
+# test_prototypes.py
+import numpy as np
+import os
+from src.prototypes import (
+    student_prototypes,
+    build_prototype_gallery,
+    stale_prototypes_warning,
+)
+
+
+def test_duplicates_dropped_and_outliers_covered():
+    rng = np.random.default_rng(0)
+    usual = rng.normal(0.0, 0.05, size=128)
+    glasses = usual + 0.06  # ~0.7 away from the usual look
+    samples = np.vstack(
+        [
+            usual + rng.normal(0.0, 0.01, size=(6, 128)),
+            usual + rng.normal(0.0, 0.01, size=(1, 128)),
+            glasses + rng.normal(0.0, 0.01, size=(3, 128)),
+        ]
+    )
+    samples[1] = samples[0] + 0.001  # a burst shot
+
+    prototypes, assignment, kinds, duplicates, uncovered = student_prototypes(
+        samples, duplicate_distance=0.1, cover_distance=0.3, max_prototypes=4
+    )
+
+    assert duplicates == 1
+    assert uncovered == 0
+    assert kinds[0] == "mean" and "medoid" in kinds
+    assert len(prototypes) < len(samples)
+    # The "glasses" photos are represented by a medoid that is one of them
+    medoid = assignment[-1]
+    assert kinds[medoid] == "medoid"
+    assert any(np.array_equal(prototypes[medoid], s) for s in samples[-3:])
+
+
+def test_gallery_keeps_source_images():
+    rng = np.random.default_rng(1)
+    encodings = rng.normal(0.0, 0.05, size=(6, 128))
+    data = {
+        "encodings": list(encodings),
+        "ids": ["A", "A", "A", "B", "B", "B"],
+        "names": ["Ann", "Ann", "Ann", "Bob", "Bob", "Bob"],
+        "paths": [f"{i}.jpg" for i in range(6)],
+    }
+
+    gallery = build_prototype_gallery(data, max_prototypes=2)
+
+    assert set(gallery["ids"]) == {"A", "B"}
+    assert len(gallery["encodings"]) == len(gallery["sources"])
+    # Every source image belongs to exactly one prototype of its own student
+    for student_id, first in (("A", 0), ("B", 3)):
+        sources = [
+            path
+            for sid, paths in zip(gallery["ids"], gallery["sources"])
+            if sid == student_id
+            for path in paths
+        ]
+        assert sorted(sources) == [f"{i}.jpg" for i in range(first, first + 3)]
+
+
+def test_warns_when_encodings_changed_after_compacting(tmp_path):
+    encodings_path = tmp_path / "encodings.pkl"
+    encodings_path.write_bytes(b"gallery")
+    mtime_ns = encodings_path.stat().st_mtime_ns
+    gallery = {"source": {"samples": 6, "mtime_ns": mtime_ns}}
+
+    assert stale_prototypes_warning(gallery, encodings_path) is None
+
+    os.utime(encodings_path, ns=(mtime_ns, mtime_ns + 1_000_000_000))  # re-encoded
+    assert "6 samples" in stale_prototypes_warning(gallery, encodings_path)
+    assert stale_prototypes_warning({}, encodings_path) is not None
@@ -0,0 +1,147 @@
+# test_scheduler.py
+import time
+import numpy as np
+import pytest
+from src import scheduler as scheduler_module
+from src.matcher import LinearMatcher
+from src.recognizer import process_tracked_frame
+from src.scheduler import FaceScheduler
+from src.tracking import FaceTracker
+from config.config import REVERIFY_FRAMES
+
+
+@pytest.fixture
+def encodes(monkeypatch):
+    """
+    Replaces face_encodings with a fake that takes 5 ms per face and returns
+    zeros. Returns the list of (top, right, bottom, left) boxes it encoded.
+    """
+    calls = []
+
+    def fake_encodings(image, locations):
+        time.sleep(0.005)
+        calls.append(tuple(locations[0]))
+        return [np.zeros(128)]
+
+    monkeypatch.setattr(
+        scheduler_module.face_recognition, "face_encodings", fake_encodings
+    )
+    return calls
+
+
+def no_match(encodings):
+    return [None] * len(encodings)
+
+
+RGB = np.zeros((120, 400, 3), dtype=np.uint8)
+BOXES = [(10, 60, 60, 10), (10, 160, 60, 110), (10, 260, 60, 210)]
+
+
+def test_deferred_faces_are_encoded_later_not_dropped(encodes):
+    tracker = FaceTracker()
+    scheduler = FaceScheduler(budget_ms=1)
+
+    tracks = tracker.update(BOXES)
+    first = scheduler.process(tracks, RGB, 1.0, tracker.frame_number, no_match)
+
+    # At least one face per frame, even over budget; the others wait
+    assert len(first) == 1
+    assert scheduler.budget_overruns == 1
+    assert scheduler.deferred_faces == 2
+    assert len(scheduler.pending) == 2
+
+    # The faces leave the picture: their saved copies are encoded next
+    seen = {track.track_id for track, _, _ in first}
+    times = []
+    for frame in range(2, 4):
+        tracks = tracker.update([])
+        for track, _, frame_time in scheduler.process(
+            tracks, RGB, float(frame), tracker.frame_number, no_match
+        ):
+            seen.add(track.track_id)
+            times.append(frame_time)
+
+    assert seen == {1, 2, 3}
+    assert times == [1.0, 1.0]  # attendance uses the time they were seen
+    assert scheduler.pending == {}
+    assert scheduler.faces_encoded == 3
+    assert scheduler.frames == 3
+
+
+def test_unknown_and_bigger_faces_first(encodes):
+    tracker = FaceTracker()
+    scheduler = FaceScheduler(budget_ms=1)
+    small, big, known = (10, 60, 30, 40), (10, 200, 90, 120), (10, 390, 110, 290)
+
+    tracks = tracker.update([small, big, known])
+    tracks[2].student_id = "S1"
+    for _ in range(3):
+        for track, _, _ in scheduler.process(
+            tracks, RGB, 1.0, tracker.frame_number, no_match
+        ):
+            track.student_id = "S1"  # as if recognised
+        tracks = tracker.update([small, big, known])
+
+    # Unknown faces first (bigger before smaller); the recognised face's
+    # re-check waits, but gains priority until it gets its turn
+    assert encodes == [big, small, known]
+    assert scheduler.deferred_faces == 9 - 3
+    # Recognised faces aren't saved, only how many frames they have waited
+    assert scheduler.pending == {}
+    assert scheduler.waiting == {1: 1, 2: 2}
+
+
+def test_no_budget_encodes_everything(encodes):
+    tracker = FaceTracker()
+    scheduler = FaceScheduler(budget_ms=None)
+
+    tracks = tracker.update(BOXES)
+    results = scheduler.process(tracks, RGB, 1.0, tracker.frame_number, no_match)
+
+    assert len(results) == 3
+    assert scheduler.budget_overruns == scheduler.deferred_faces == 0
+
+
+def test_recognised_face_is_only_rechecked_every_reverify_frames(encodes):
+    class FakeProcessor:
+        class detector:
+            @staticmethod
+            def detect(rgb):
+                return [BOXES[0]]
+
+    tracker = FaceTracker()
+    scheduler = FaceScheduler(budget_ms=1000)
+    matcher = LinearMatcher(np.zeros((1, 128)))
+
+    for frame in range(REVERIFY_FRAMES + 1):
+        _, names = process_tracked_frame(
+            FakeProcessor,
+            RGB,
+            tracker,
+            scheduler,
+            matcher,
+            ["S1"],
+            ["Ann"],
+            float(frame),
+            attendance_db=None,
+        )
+        assert names == ["Ann"]
+
+    # Encoded on the first frame, then skipped until the re-check
+    assert len(encodes) == 2
+    assert scheduler.faces_skipped == REVERIFY_FRAMES - 1
+
+
+def test_tracker_follows_overlapping_boxes():
+    tracker = FaceTracker(iou_threshold=0.3, max_missed=1)
+
+    first = tracker.update([(10, 60, 60, 10), (10, 160, 60, 110)])
+    moved = tracker.update([(12, 64, 62, 14), (10, 360, 60, 310)])
+
+    assert moved[0] is first[0]
+    assert moved[1].track_id == 3  # no overlap: a new track
+    assert moved[1].first_seen == 2
+
+    tracker.update([])
+    tracker.update([])
+    assert tracker.tracks == []  # dropped after 'max_missed' frames unseen
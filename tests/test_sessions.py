@@ -0,0 +1,91 @@
+# test_sessions.py
+import sqlite3
+import numpy as np
+from src import db, sessions
+from src.matcher import LinearMatcher
+from src.sessions import SessionMatcher, read_roster_file, add_session, load_session
+
+
+def gallery():
+    """Six samples of three students (A, B, C), each far apart from the others."""
+    encodings = np.zeros((6, 128))
+    for row in range(6):
+        encodings[row, row // 2] = 1.0 + 0.01 * (row % 2)
+    return encodings, ["A", "A", "B", "B", "C", "C"]
+
+
+def session_matcher(roster):
+    encodings, ids = gallery()
+    session = {"session_id": "X", "roster": set(roster), "marked": set()}
+    return SessionMatcher(session, encodings, ids, LinearMatcher(encodings))
+
+
+def test_roster_hit_returns_full_gallery_index():
+    encodings, _ = gallery()
+    matcher = session_matcher(["C"])
+
+    assert matcher.match([encodings[5]]) == [5]
+    assert matcher.roster_misses == 0
+    assert matcher.comparisons == 2  # only the roster's two rows
+
+
+def test_face_not_on_roster_falls_back_to_full_gallery():
+    encodings, _ = gallery()
+    matcher = session_matcher(["C"])
+
+    assert matcher.match([encodings[2], encodings[4], np.full(128, 5.0)]) == [
+        2,
+        4,
+        None,
+    ]
+    assert matcher.faces_matched == 3
+    assert matcher.roster_misses == 2
+    assert matcher.comparisons == 3 * 2 + 2 * 6
+
+
+def test_empty_roster_always_uses_full_gallery():
+    encodings, _ = gallery()
+    matcher = session_matcher([])
+
+    assert matcher.match([encodings[1]]) == [1]
+    assert matcher.roster_misses == 1
+    assert matcher.comparisons == 6
+
+
+def test_roster_file_with_header_or_bare_ids(tmp_path):
+    with_header = tmp_path / "with_header.csv"
+    with_header.write_text("name,student_id\nAnn,S1\nBob, S2 \n\n")
+    bare = tmp_path / "bare.csv"
+    bare.write_text("S1\nS2,extra\n\n")
+
+    assert read_roster_file(with_header) == ["S1", "S2"]
+    assert read_roster_file(bare) == ["S1", "S2"]
+
+
+def test_add_and_load_session(tmp_path, monkeypatch):
+    db_path = tmp_path / "students.db"
+    monkeypatch.setattr(db, "DB_PATH", db_path)
+    monkeypatch.setattr(sessions, "DB_PATH", db_path)
+    db.create_database()
+
+    conn = sqlite3.connect(str(db_path))
+    conn.executemany(
+        "INSERT INTO students (student_id, name) VALUES (?, ?)",
+        [("S1", "Ann"), ("S2", "Bob")],
+    )
+    conn.executemany(
+        "INSERT INTO attendance (student_id, name, timestamp) VALUES (?, ?, ?)",
+        [("S1", "Ann", "2026-10-19 09:05:00"), ("S2", "Bob", "2026-10-18 09:05:00")],
+    )
+    conn.commit()
+    conn.close()
+
+    roster = tmp_path / "roster.csv"
+    roster.write_text("S1\nS2\nS9\n")  # S9 is not enrolled
+    add_session("CS101", "Intro", "2026-10-19 09:00:00", "2026-10-19 11:00:00", roster)
+
+    session = load_session("CS101")
+    assert session["name"] == "Intro"
+    assert session["roster"] == {"S1", "S2"}
+    assert session["marked"] == {"S1"}  # S2's row is from the day before
+    assert load_session("nope") is None